@@ -4,8 +4,9 @@ adminユーザーを保持しつつ、他のデータを安全にリセット
 """
 
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db import connection, transaction
 from django.utils import timezone
+from django.utils.text import slugify
 from accounts.models import User, UserProfile
 from blog.models import Article, Tag, ArticleLike, ArticleView
 from comments.models import Comment, CommentLike, CommentReport, CommentModerationLog
@@ -14,6 +15,9 @@ import sys
 
 class Command(BaseCommand):
     help = 'データベースをリセット（adminユーザーは保持）'
+    
+    # ORM経由で削除する際の1回あたりの件数
+    DELETE_CHUNK_SIZE = 5000
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -88,48 +92,69 @@ class Command(BaseCommand):
 
     def _show_current_data(self):
         """現在のデータ状況を表示"""
+        (user_count, article_count, tag_count, comment_count,
+         view_count, like_count, comment_like_count) = self._count_rows(
+            [User, Article, Tag, Comment, ArticleView, ArticleLike, CommentLike]
+        )
         self.stdout.write('\n📊 現在のデータ状況:')
-        self.stdout.write(f'  👥 ユーザー: {User.objects.count()}人')
-        self.stdout.write(f'  📝 記事: {Article.objects.count()}件')
-        self.stdout.write(f'  🏷️  タグ: {Tag.objects.count()}個')
-        self.stdout.write(f'  💬 コメント: {Comment.objects.count()}件')
-        self.stdout.write(f'  👀 記事閲覧: {ArticleView.objects.count()}件')
-        self.stdout.write(f'  👍 記事いいね: {ArticleLike.objects.count()}件')
-        self.stdout.write(f'  💭 コメントいいね: {CommentLike.objects.count()}件')
+        self.stdout.write(f'  👥 ユーザー: {user_count}人')
+        self.stdout.write(f'  📝 記事: {article_count}件')
+        self.stdout.write(f'  🏷️  タグ: {tag_count}個')
+        self.stdout.write(f'  💬 コメント: {comment_count}件')
+        self.stdout.write(f'  👀 記事閲覧: {view_count}件')
+        self.stdout.write(f'  👍 記事いいね: {like_count}件')
+        self.stdout.write(f'  💭 コメントいいね: {comment_like_count}件')
+
+    def _count_rows(self, models):
+        """複数テーブルの件数を1回のクエリでまとめて取得"""
+        quote_name = connection.ops.quote_name
+        sql = 'SELECT ' + ', '.join(
+            f'(SELECT COUNT(*) FROM {quote_name(model._meta.db_table)})' for model in models
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            return cursor.fetchone()
 
     def _reset_database(self, admin_user):
         """データベースリセット実行"""
         
         # 1. コメント関連データの削除
         self.stdout.write('  🗑️  コメント関連データを削除中...')
-        CommentModerationLog.objects.all().delete()
-        CommentReport.objects.all().delete()
-        CommentLike.objects.all().delete()
-        Comment.objects.all().delete()
+        self._raw_delete(CommentModerationLog)
+        self._raw_delete(CommentReport)
+        self._raw_delete(CommentLike)
+        # 自己参照FKで削除順に依存しないよう、先に親子関係を外す
+        Comment.objects.filter(parent__isnull=False).update(parent=None)
+        self._raw_delete(Comment)
         
         # 2. 記事関連データの削除
         self.stdout.write('  🗑️  記事関連データを削除中...')
-        ArticleView.objects.all().delete()
-        ArticleLike.objects.all().delete()
-        Article.objects.all().delete()
+        self._raw_delete(ArticleView)
+        self._raw_delete(ArticleLike)
+        self._raw_delete(Article.tags.through)
+        self._raw_delete(Article)
         
         # 3. タグの削除
         self.stdout.write('  🗑️  タグを削除中...')
-        Tag.objects.all().delete()
+        self._raw_delete(Tag)
         
         # 4. adminユーザー以外のユーザーとプロファイルを削除
         self.stdout.write('  🗑️  ユーザー（admin除く）を削除中...')
-        other_users = User.objects.exclude(id=admin_user.id)
-        other_user_ids = list(other_users.values_list('id', flat=True))
-        
-        # プロファイルも削除
-        UserProfile.objects.filter(user_id__in=other_user_ids).delete()
-        other_users.delete()
+        # プロファイルはUserからのCASCADEで同時に削除される
+        # 件数が多くてもメモリ使用量が一定になるよう、主キーを分割して削除する
+        users = User.objects.exclude(id=admin_user.id)
+        while ids := list(users.values_list('id', flat=True)[:self.DELETE_CHUNK_SIZE]):
+            User.objects.filter(id__in=ids).delete()
         
         self.stdout.write(
             self.style.SUCCESS(f'  ✅ adminユーザー "{admin_user.username}" を保持してリセット完了')
         )
 
+    def _raw_delete(self, model):
+        """全行を1文のDELETEで削除（ORMのカスケード収集・シグナルを経由しない）"""
+        queryset = model._base_manager.all()
+        return queryset._raw_delete(queryset.db)
+
     def _create_sample_data(self):
         """サンプルデータの作成"""
         self.stdout.write('\n🎯 サンプルデータを作成中...')
@@ -151,7 +176,6 @@ class Command(BaseCommand):
         )
         
         # サンプルタグの作成
-        tags = []
         tag_data = [
             {'name': 'Python', 'color': '#3776ab', 'description': 'Pythonプログラミング'},
             {'name': 'Django', 'color': '#092e20', 'description': 'Djangoフレームワーク'},
@@ -159,9 +183,13 @@ class Command(BaseCommand):
             {'name': 'React', 'color': '#61dafb', 'description': 'Reactライブラリ'},
         ]
         
-        for tag_info in tag_data:
-            tag = Tag.objects.create(**tag_info)
-            tags.append(tag)
+        # bulk_createはsave()を経由しないため、スラグはここで設定する
+        Tag.objects.bulk_create([
+            Tag(slug=slugify(tag_info['name']), **tag_info) for tag_info in tag_data
+        ])
+        # MySQLのbulk_createは主キーを返さないため、名前で取得し直す
+        tags_by_name = Tag.objects.in_bulk([tag_info['name'] for tag_info in tag_data], field_name='name')
+        tags = [tags_by_name[tag_info['name']] for tag_info in tag_data]
         
         # サンプル記事の作成
         articles_data = [
@@ -217,25 +245,48 @@ class Command(BaseCommand):
             }
         ]
         
-        created_articles = []
-        for article_data in articles_data:
-            article_tags = article_data.pop('tags')
-            article = Article.objects.create(
+        now = timezone.now()
+        article_tags = [article_data.pop('tags') for article_data in articles_data]
+        # Article.save()のSEOメタデータ・HTMLキャッシュ生成はbulk_createでは走らないため、ここで設定する
+        articles = [
+            Article(
                 author=sample_user,
-                published_at=timezone.now(),
+                published_at=now,
+                meta_title=article_data['title'][:60],
+                meta_description=article_data['excerpt'][:160],
                 **article_data
             )
-            article.tags.set(article_tags)
-            created_articles.append(article)
+            for article_data in articles_data
+        ]
+        for article in articles:
+            article.update_content_cache()
+        Article.objects.bulk_create(articles)
+        articles_by_slug = Article.objects.in_bulk(
+            [article_data['slug'] for article_data in articles_data], field_name='slug'
+        )
+        created_articles = [articles_by_slug[article_data['slug']] for article_data in articles_data]
+        # 中間テーブルへ直接まとめてINSERTする（記事ごとのtags.set()を避ける）
+        ArticleTag = Article.tags.through
+        ArticleTag.objects.bulk_create([
+            ArticleTag(article_id=article.id, tag_id=tag.id)
+            for article, tags_for_article in zip(created_articles, article_tags)
+            for tag in tags_for_article
+        ])
+        # 中間テーブルへの直接INSERTではシグナルが走らないため、タグの公開記事数を再集計
+        Tag.update_published_article_counts([tag.id for tag in tags])
         
         # サンプルコメントの作成
-        for i, article in enumerate(created_articles):
-            Comment.objects.create(
+        Comment.objects.bulk_create([
+            Comment(
                 article=article,
                 author=sample_user,
                 content=f'この記事「{article.title}」はとても参考になりました！ありがとうございます。',
                 is_approved=True
             )
+            for article in created_articles
+        ])
+        # bulk_createではシグナルが走らないため、記事のコメント数を再集計
+        Article.update_comment_counts([article.id for article in created_articles])
         
         self.stdout.write(
             self.style.SUCCESS(f'✅ サンプルデータを作成しました:')
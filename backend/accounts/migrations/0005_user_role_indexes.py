@@ -0,0 +1,22 @@
+# Generated by Django 4.2.6 on 2026-10-15 21:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_remove_django_permissions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('admin', '管理者'), ('editor', '編集者')], db_index=True, default='editor', max_length=10, verbose_name='権限'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_active', 'role', '-created_at'], name='accounts_us_is_acti_0e3dbc_idx'),
+        ),
+    ]
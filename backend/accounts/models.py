@@ -9,9 +9,12 @@ class User(AbstractUser):
         ('admin', '管理者'),
         ('editor', '編集者'),
     ]
+    # 権限値の検証・表示名の参照用
+    VALID_ROLES = frozenset(dict(ROLE_CHOICES))
+    ROLE_DISPLAY = dict(ROLE_CHOICES)
     
     email = models.EmailField('メールアドレス', unique=True)
-    role = models.CharField('権限', max_length=10, choices=ROLE_CHOICES, default='editor')
+    role = models.CharField('権限', max_length=10, choices=ROLE_CHOICES, default='editor', db_index=True)
     bio = models.TextField('自己紹介', blank=True, max_length=500)
     avatar = models.ImageField('アバター', upload_to='avatars/', blank=True, null=True)
     website = models.URLField('ウェブサイト', blank=True)
@@ -32,27 +35,31 @@ class User(AbstractUser):
         verbose_name = 'ユーザー'
         verbose_name_plural = 'ユーザー'
         db_table = 'accounts_user'
+        indexes = [
+            models.Index(fields=['is_active', 'role', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.username} ({self.email})"
     
+    # 権限判定はroleの比較のみのため、roleの変更が即座に反映されるよう都度評価する
     @property
     def is_admin(self):
         return self.role == 'admin'
     
     @property
     def is_editor(self):
-        return self.role in ['admin', 'editor']
+        return self.role in ('admin', 'editor')
     
     @property
     def is_author(self):
         # 全ユーザーが記事投稿可能（editorに統合）
-        return self.role in ['admin', 'editor']
+        return self.role in ('admin', 'editor')
     
     @property
     def can_publish(self):
         # 全ユーザーが記事公開可能
-        return self.role in ['admin', 'editor']
+        return self.role in ('admin', 'editor')
     
     @property
     def can_delete_others_posts(self):
@@ -1,10 +1,42 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils.encoding import filepath_to_uri
 from .models import User, UserProfile
 
 
+class MediaURLField(serializers.Field):
+    """保存パスとMEDIA_URLからURLを組み立てる読み取り専用のファイルフィールド
+    
+    ストレージバックエンドの url() を経由しないため、一覧での出力が軽量になる。
+    """
+    
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, value):
+        if not value:
+            return None
+        url = settings.MEDIA_URL + filepath_to_uri(value.name)
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
+def annotate_user_counts(queryset):
+    """UserSerializer の公開記事数・承認済みコメント数を1クエリで集計して付与"""
+    return queryset.annotate(
+        article_count_ann=Count('articles', filter=Q(articles__status='published'), distinct=True),
+        comment_count_ann=Count('comments', filter=Q(comments__is_approved=True), distinct=True),
+    )
+
+
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """ユーザー登録用シリアライザー"""
     
@@ -22,7 +54,10 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         validated_data.pop('password_confirm')
-        user = User.objects.create_user(**validated_data)
+        with transaction.atomic():
+            user = User.objects.create_user(**validated_data)
+            # プロフィールも同時に作成し、以降の取得を1回のSELECTで済ませる
+            UserProfile.objects.create(user=user)
         return user
 
 
@@ -56,10 +91,26 @@ class UserProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ['user']
 
 
+class AuthUserSerializer(serializers.ModelSerializer):
+    """認証レスポンス用ユーザーシリアライザー（プロフィール・集計値を含まない）"""
+    
+    avatar = MediaURLField()
+    
+    class Meta:
+        model = User
+        fields = [
+            'id', 'username', 'email', 'first_name', 'last_name',
+            'role', 'bio', 'avatar', 'website', 'twitter', 'github',
+            'is_email_verified', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
 class UserSerializer(serializers.ModelSerializer):
     """ユーザー情報用シリアライザー"""
     
     profile = UserProfileSerializer(read_only=True)
+    avatar = MediaURLField()
     article_count = serializers.SerializerMethodField()
     comment_count = serializers.SerializerMethodField()
     
@@ -74,9 +125,14 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'is_email_verified']
     
     def get_article_count(self, obj):
+        # ビュー側で集計済みの場合は追加クエリを発行しない
+        if hasattr(obj, 'article_count_ann'):
+            return obj.article_count_ann
         return obj.articles.filter(status='published').count()
     
     def get_comment_count(self, obj):
+        if hasattr(obj, 'comment_count_ann'):
+            return obj.comment_count_ann
         return obj.comments.filter(is_approved=True).count()
 
 
@@ -92,7 +148,8 @@ class UserUpdateSerializer(serializers.ModelSerializer):
     
     def validate_username(self, value):
         user = self.context['request'].user
-        if User.objects.exclude(pk=user.pk).filter(username=value).exists():
+        # usernameのUNIQUEインデックスで1行だけ探索する
+        if User.objects.filter(Q(username=value) & ~Q(pk=user.pk)).exists():
             raise serializers.ValidationError("このユーザー名は既に使用されています。")
         return value
 
@@ -101,7 +158,7 @@ class ChangePasswordSerializer(serializers.Serializer):
     """パスワード変更用シリアライザー"""
     
     old_password = serializers.CharField(write_only=True)
-    new_password = serializers.CharField(write_only=True, validators=[validate_password])
+    new_password = serializers.CharField(write_only=True)
     new_password_confirm = serializers.CharField(write_only=True)
     
     def validate_old_password(self, value):
@@ -113,6 +170,11 @@ class ChangePasswordSerializer(serializers.Serializer):
     def validate(self, attrs):
         if attrs['new_password'] != attrs['new_password_confirm']:
             raise serializers.ValidationError("新しいパスワードが一致しません。")
+        # パスワード強度の検証は重いため、現在のパスワード確認を通過した後にのみ実行する
+        try:
+            validate_password(attrs['new_password'], user=self.context['request'].user)
+        except ValidationError as e:
+            raise serializers.ValidationError({'new_password': list(e.messages)})
         return attrs
     
     def save(self):
@@ -128,9 +190,7 @@ class PasswordResetRequestSerializer(serializers.Serializer):
     email = serializers.EmailField()
     
     def validate_email(self, value):
-        try:
-            user = User.objects.get(email=value, is_active=True)
-        except User.DoesNotExist:
+        if not User.objects.filter(email=value, is_active=True).exists():
             raise serializers.ValidationError("このメールアドレスは登録されていません。")
         return value
 
@@ -0,0 +1,97 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .models import User
+
+
+class UserViewSetPermissionTests(APITestCase):
+    """管理者用ユーザー管理APIの権限テスト"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='password', role='admin'
+        )
+        self.editor = User.objects.create_user(
+            username='editor', email='editor@example.com', password='password', role='editor'
+        )
+        self.other_editor = User.objects.create_user(
+            username='other', email='other@example.com', password='password', role='editor'
+        )
+
+    def test_editor_cannot_change_own_role(self):
+        """編集者は自分の権限を変更できない"""
+        self.client.force_authenticate(self.editor)
+        url = reverse('accounts:admin-users-change-role', args=[self.editor.pk])
+        response = self.client.post(url, {'role': 'admin'})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.editor.refresh_from_db()
+        self.assertEqual(self.editor.role, 'editor')
+
+    def test_editor_cannot_write(self):
+        """編集者は権限変更・有効化切り替え・更新・削除ができない"""
+        self.client.force_authenticate(self.editor)
+        pk = self.other_editor.pk
+        requests = [
+            ('post', reverse('accounts:admin-users-change-role', args=[pk]), {'role': 'admin'}),
+            ('post', reverse('accounts:admin-users-toggle-active', args=[pk]), {}),
+            ('patch', reverse('accounts:admin-users-detail', args=[pk]), {'is_superuser': True}),
+            ('put', reverse('accounts:admin-users-detail', args=[pk]), {'role': 'admin'}),
+            ('delete', reverse('accounts:admin-users-detail', args=[pk]), None),
+            ('post', reverse('accounts:admin-users-list'), {'username': 'new'}),
+        ]
+        for method, url, data in requests:
+            with self.subTest(method=method, url=url):
+                response = getattr(self.client, method)(url, data)
+                self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.other_editor.refresh_from_db()
+        self.assertEqual(self.other_editor.role, 'editor')
+        self.assertTrue(self.other_editor.is_active)
+        self.assertFalse(self.other_editor.is_superuser)
+
+    def test_editor_list_excludes_self_and_admins(self):
+        """編集者の一覧には自分と管理者が含まれない"""
+        self.client.force_authenticate(self.editor)
+        response = self.client.get(reverse('accounts:admin-users-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = {user['id'] for user in response.data['results']}
+        self.assertEqual(ids, {self.other_editor.pk})
+
+    def test_admin_can_change_role(self):
+        """管理者は権限を変更できる"""
+        self.client.force_authenticate(self.admin)
+        url = reverse('accounts:admin-users-change-role', args=[self.editor.pk])
+        response = self.client.post(url, {'role': 'admin'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.editor.refresh_from_db()
+        self.assertEqual(self.editor.role, 'admin')
+
+    def test_change_role_rejects_non_string_role(self):
+        """文字列以外の権限は400になる"""
+        self.client.force_authenticate(self.admin)
+        url = reverse('accounts:admin-users-change-role', args=[self.editor.pk])
+        for role in (['admin'], {}):
+            with self.subTest(role=role):
+                response = self.client.post(url, {'role': role}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class UserRolePropertyTests(APITestCase):
+    """権限判定プロパティのテスト"""
+
+    def test_role_change_is_reflected_on_same_instance(self):
+        """同じインスタンスで権限を変更すると判定結果も変わる"""
+        user = User.objects.create_user(
+            username='editor', email='editor@example.com', password='password', role='editor'
+        )
+        self.assertFalse(user.is_admin)
+
+        user.role = 'admin'
+        user.save(update_fields=['role'])
+
+        self.assertTrue(user.is_admin)
+        self.assertTrue(user.can_delete_others_posts)
@@ -8,6 +8,7 @@ from rest_framework import generics, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import logout
@@ -16,18 +17,33 @@ from .models import User, UserProfile
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
+    AuthUserSerializer,
     UserSerializer,
     UserUpdateSerializer,
     ChangePasswordSerializer,
     AdminUserSerializer,
     UserProfileSerializer,
     PasswordResetRequestSerializer,
-    PasswordResetConfirmSerializer
+    PasswordResetConfirmSerializer,
+    annotate_user_counts,
 )
 
 logger = logging.getLogger(__name__)
 
 
+# UserSerializerが出力するユーザー列（一覧ではこれ以外の列を取得しない）
+PUBLIC_USER_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name',
+    'role', 'bio', 'avatar', 'website', 'twitter', 'github',
+    'is_email_verified', 'created_at', 'updated_at', 'profile',
+)
+
+
+def get_public_user_queryset():
+    """公開プロフィール用クエリセット（プロフィールをJOINし、記事数・コメント数を1クエリで集計）"""
+    return annotate_user_counts(User.objects.filter(is_active=True).select_related('profile'))
+
+
 class UserRegistrationView(generics.CreateAPIView):
     """ユーザー登録API"""
     
@@ -44,7 +60,7 @@ class UserRegistrationView(generics.CreateAPIView):
         refresh = RefreshToken.for_user(user)
         
         return Response({
-            'user': UserSerializer(user).data,
+            'user': AuthUserSerializer(user).data,
             'tokens': {
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
@@ -65,7 +81,7 @@ class UserLoginView(TokenObtainPairView):
         refresh = RefreshToken.for_user(user)
         
         return Response({
-            'user': UserSerializer(user).data,
+            'user': AuthUserSerializer(user).data,
             'tokens': {
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
@@ -79,13 +95,15 @@ class UserLogoutView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request, *args, **kwargs):
+        refresh_token = request.data.get('refresh_token')
+        if not isinstance(refresh_token, str) or not refresh_token:
+            return Response({'error': 'リフレッシュトークンが必要です。'}, status=status.HTTP_400_BAD_REQUEST)
+        
         try:
-            refresh_token = request.data.get('refresh_token')
-            token = RefreshToken(refresh_token)
-            token.blacklist()
-            return Response({'message': 'ログアウトしました。'}, status=status.HTTP_200_OK)
-        except Exception as e:
+            RefreshToken(refresh_token).blacklist()
+        except TokenError:
             return Response({'error': 'トークンが無効です。'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'message': 'ログアウトしました。'}, status=status.HTTP_200_OK)
 
 
 class UserProfileView(generics.RetrieveUpdateAPIView):
@@ -129,28 +147,33 @@ class ChangePasswordView(generics.GenericAPIView):
 class UserDetailView(generics.RetrieveAPIView):
     """ユーザー詳細情報取得API（公開プロフィール）"""
     
-    queryset = User.objects.filter(is_active=True)
     serializer_class = UserSerializer
     lookup_field = 'username'
     permission_classes = [permissions.AllowAny]
+    
+    def get_queryset(self):
+        return get_public_user_queryset()
 
 
 class UserListView(generics.ListAPIView):
     """ユーザー一覧取得API（公開プロフィール）"""
     
-    queryset = User.objects.filter(is_active=True)
     serializer_class = UserSerializer
     permission_classes = [permissions.AllowAny]
     filterset_fields = ['role']
     search_fields = ['username', 'first_name', 'last_name']
     ordering_fields = ['created_at', 'username']
     ordering = ['-created_at']
+    
+    def get_queryset(self):
+        # パスワードハッシュ等、UserSerializerが出力しない列は取得しない
+        return get_public_user_queryset().only(*PUBLIC_USER_FIELDS)
 
 
 class UserViewSet(ModelViewSet):
     """管理者用ユーザー管理API"""
     
-    queryset = User.objects.all()
+    queryset = User.objects.select_related('profile')
     serializer_class = AdminUserSerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ['role', 'is_active', 'is_staff']
@@ -158,23 +181,26 @@ class UserViewSet(ModelViewSet):
     ordering_fields = ['created_at', 'username', 'email']
     ordering = ['-created_at']
     
-    def get_permissions(self):
-        """アクションに応じて権限を変更"""
+    def check_permissions(self, request):
+        """アクションに応じて権限をチェック"""
+        super().check_permissions(request)
         if self.action in ['list', 'retrieve']:
             # 一覧・詳細は編集者以上
-            self.permission_classes = [permissions.IsAuthenticated]
-        else:
-            # 作成・更新・削除は管理者のみ
-            self.permission_classes = [permissions.IsAuthenticated]
-        return super().get_permissions()
+            if not request.user.is_editor:
+                self.permission_denied(request, '編集者以上の権限が必要です。')
+        elif not request.user.is_admin:
+            # 作成・更新・削除・権限変更・有効化切り替えは管理者のみ
+            self.permission_denied(request, '管理者権限が必要です。')
     
     def get_queryset(self):
         """ユーザーの権限に応じてクエリセットを制限"""
         user = self.request.user
+        queryset = User.objects.select_related('profile')
         if user.is_admin:
-            return User.objects.all()
+            return queryset
         elif user.is_editor:
-            return User.objects.filter(role__in=['reader', 'author'])
+            # 編集者は自分以外の管理者以外のユーザーのみ閲覧可能（閲覧のみ）
+            return queryset.filter(role='editor').exclude(pk=user.pk)
         else:
             return User.objects.none()
     
@@ -183,7 +209,7 @@ class UserViewSet(ModelViewSet):
         """ユーザーのアクティブ状態を切り替え"""
         user = self.get_object()
         user.is_active = not user.is_active
-        user.save()
+        user.save(update_fields=['is_active', 'updated_at'])
         return Response({
             'message': f"ユーザー {user.username} が{'有効' if user.is_active else '無効'}になりました。"
         })
@@ -194,14 +220,14 @@ class UserViewSet(ModelViewSet):
         user = self.get_object()
         new_role = request.data.get('role')
         
-        if new_role not in [choice[0] for choice in User.ROLE_CHOICES]:
+        if not isinstance(new_role, str) or new_role not in User.VALID_ROLES:
             return Response({'error': '無効な権限です。'}, status=status.HTTP_400_BAD_REQUEST)
         
         user.role = new_role
-        user.save()
+        user.save(update_fields=['role', 'updated_at'])
         
         return Response({
-            'message': f"ユーザー {user.username} の権限が {user.get_role_display()} に変更されました。"
+            'message': f"ユーザー {user.username} の権限が {User.ROLE_DISPLAY[user.role]} に変更されました。"
         })
 
 
@@ -212,8 +238,13 @@ class UserProfileDetailView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
-        profile, created = UserProfile.objects.get_or_create(user=self.request.user)
-        return profile
+        user = self.request.user
+        try:
+            return user.profile
+        except UserProfile.DoesNotExist:
+            # 登録時にプロフィールが作成されていない既存ユーザー向けのフォールバック
+            profile, created = UserProfile.objects.get_or_create(user=user)
+            return profile
 
 
 class PasswordResetRequestView(generics.GenericAPIView):
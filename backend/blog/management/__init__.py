@@ -0,0 +1 @@
+# Django management commands directory 
\ No newline at end of file
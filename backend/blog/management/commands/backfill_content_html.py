@@ -0,0 +1,44 @@
+"""
+記事本文HTMLキャッシュ・読了時間のバックフィル管理コマンド
+キャッシュ未生成・本文変更済みの記事のHTMLを再生成
+"""
+
+from django.core.management.base import BaseCommand
+from blog.models import Article
+
+
+class Command(BaseCommand):
+    help = '記事本文のHTMLキャッシュを生成'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='1回の更新件数（デフォルト: 500）',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        articles = Article.objects.only('id', 'content', 'content_hash').order_by('id')
+
+        batch = []
+        updated_count = 0
+        for article in articles.iterator(chunk_size=batch_size):
+            if article.update_content_cache():
+                batch.append(article)
+            if len(batch) >= batch_size:
+                updated_count += self._flush(batch)
+        updated_count += self._flush(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {updated_count}件の記事のHTMLキャッシュを更新しました')
+        )
+
+    def _flush(self, batch):
+        """蓄積した記事をまとめて更新"""
+        count = len(batch)
+        if count:
+            Article.objects.bulk_update(batch, ['content_html_cached', 'content_hash', 'reading_time'])
+            batch.clear()
+        return count
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.6 on 2026-10-15 21:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_remove_category_parent_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='本文ハッシュ'),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='content_html_cached',
+            field=models.TextField(blank=True, editable=False, verbose_name='本文HTMLキャッシュ'),
+        ),
+    ]
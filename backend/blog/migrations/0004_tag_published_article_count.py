@@ -0,0 +1,31 @@
+# Generated by Django 4.2.6 on 2026-10-15 21:09
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_published_article_count(apps, schema_editor):
+    """既存タグの公開記事数を集計"""
+    Tag = apps.get_model('blog', 'Tag')
+    Article = apps.get_model('blog', 'Article')
+    published = Article.tags.through.objects.filter(
+        tag=OuterRef('pk'), article__status='published'
+    ).order_by().values('tag').annotate(count=Count('pk')).values('count')
+    Tag.objects.update(published_article_count=Coalesce(Subquery(published), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_article_content_html_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='published_article_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='公開記事数'),
+        ),
+        migrations.RunPython(backfill_published_article_count, migrations.RunPython.noop),
+    ]
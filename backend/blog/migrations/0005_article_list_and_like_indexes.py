@@ -0,0 +1,21 @@
+# Generated by Django 4.2.6 on 2026-10-15 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_tag_published_article_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['status', 'is_pinned', '-published_at'], name='blog_articl_status_aa7800_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articlelike',
+            index=models.Index(fields=['user', 'article'], name='blog_articl_user_id_e936b3_idx'),
+        ),
+    ]
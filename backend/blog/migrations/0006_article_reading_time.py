@@ -0,0 +1,33 @@
+# Generated by Django 4.2.6 on 2026-10-15 21:11
+
+from django.db import migrations, models
+
+
+def backfill_reading_time(apps, schema_editor):
+    """既存記事の読了時間を本文の文字数から計算（500文字/分）"""
+    Article = apps.get_model('blog', 'Article')
+    batch = []
+    for article in Article.objects.only('id', 'content').iterator(chunk_size=500):
+        article.reading_time = max(1, round(len(article.content) / 500))
+        batch.append(article)
+        if len(batch) >= 500:
+            Article.objects.bulk_update(batch, ['reading_time'])
+            batch = []
+    if batch:
+        Article.objects.bulk_update(batch, ['reading_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_article_list_and_like_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='読了時間（分）'),
+        ),
+        migrations.RunPython(backfill_reading_time, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.6 on 2026-10-15 21:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_article_reading_time'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['status', '-view_count', '-id'], name='blog_articl_status_cdd4e2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['status', '-published_at', '-id'], name='blog_articl_status_a7d2aa_idx'),
+        ),
+    ]
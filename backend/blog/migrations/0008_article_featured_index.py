@@ -0,0 +1,17 @@
+# Generated by Django 4.2.6 on 2026-10-15 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_article_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['status', 'is_featured', '-published_at'], name='blog_articl_status_72421d_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.6 on 2026-10-15 21:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_article_featured_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='articleview',
+            index=models.Index(fields=['article', 'ip_address'], name='blog_articl_article_f43e49_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articleview',
+            index=models.Index(fields=['article', 'user'], name='blog_articl_article_7913ba_idx'),
+        ),
+    ]
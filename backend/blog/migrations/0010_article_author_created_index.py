@@ -0,0 +1,17 @@
+# Generated by Django 4.2.6 on 2026-10-15 21:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_articleview_viewer_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['author', '-created_at'], name='blog_articl_author__524cfd_idx'),
+        ),
+    ]
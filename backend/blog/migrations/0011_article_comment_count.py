@@ -0,0 +1,32 @@
+# Generated by Django 4.2.6 on 2026-10-15 21:22
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_comment_count(apps, schema_editor):
+    """既存記事の承認済みコメント数を集計"""
+    Article = apps.get_model('blog', 'Article')
+    Comment = apps.get_model('comments', 'Comment')
+    approved = Comment.objects.filter(
+        article=OuterRef('pk'), is_approved=True
+    ).order_by().values('article').annotate(count=Count('pk')).values('count')
+    Article.objects.update(comment_count=Coalesce(Subquery(approved), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_article_author_created_index'),
+        ('comments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='コメント数'),
+        ),
+        migrations.RunPython(backfill_comment_count, migrations.RunPython.noop),
+    ]
@@ -2,12 +2,45 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.utils.text import slugify
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+import hashlib
+import threading
 import markdown
 from django.utils.html import mark_safe
 
 User = get_user_model()
 
+MARKDOWN_EXTENSIONS = ['markdown.extensions.codehilite', 'markdown.extensions.fenced_code']
+
+# 関連記事IDのキャッシュキー（記事IDで展開）
+RELATED_ARTICLES_CACHE_KEY = 'related_articles:{}'
+# 記事一覧用の著者情報のキャッシュキー（ユーザーIDで展開）
+AUTHOR_SUMMARY_CACHE_KEY = 'author_summary:{}'
+# 記事一覧APIのレスポンスキャッシュのエイリアス
+ARTICLE_PAGE_CACHE = 'article_pages'
+
+
+# 日本語の平均読解速度（文字/分）
+READING_CHARS_PER_MINUTE = 500
+
+
+def calculate_reading_time(content):
+    """読了時間を計算（分）"""
+    return max(1, round(len(content) / READING_CHARS_PER_MINUTE))
+
+
+# Markdown変換器はスレッドごとに1度だけ生成して使い回す（インスタンスはスレッドセーフではない）
+_markdown_local = threading.local()
+
+
+def render_markdown(content):
+    """MarkdownをHTMLに変換"""
+    converter = getattr(_markdown_local, 'converter', None)
+    if converter is None:
+        converter = _markdown_local.converter = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    return converter.reset().convert(content)
+
 
 class Tag(models.Model):
     """記事タグ"""
@@ -17,6 +50,8 @@ class Tag(models.Model):
     description = models.TextField('説明', blank=True)
     color = models.CharField('カラーコード', max_length=7, default='#6c757d')
     is_active = models.BooleanField('有効', default=True)
+    # 公開記事数（シグナルで更新する非正規化カラム）
+    published_article_count = models.PositiveIntegerField('公開記事数', default=0, editable=False)
     created_at = models.DateTimeField('作成日時', auto_now_add=True)
     
     class Meta:
@@ -35,15 +70,27 @@ class Tag(models.Model):
     
     def get_article_count(self):
         """このタグが付けられた記事数"""
-        return self.articles.filter(status='published').count()
+        return self.published_article_count
+    
+    @classmethod
+    def update_published_article_counts(cls, tag_ids):
+        """指定タグの公開記事数を1回のUPDATEで再集計"""
+        if not tag_ids:
+            return
+        published = Article.tags.through.objects.filter(
+            tag=models.OuterRef('pk'), article__status='published'
+        ).order_by().values('tag').annotate(count=models.Count('pk')).values('count')
+        cls.objects.filter(pk__in=tag_ids).update(
+            published_article_count=Coalesce(models.Subquery(published), 0)
+        )
 
 
 class ArticleManager(models.Manager):
     """記事モデル用のカスタムマネージャー"""
     
-    def published(self):
-        """公開済み記事のみを取得"""
-        return self.filter(status='published', published_at__lte=timezone.now())
+    def published(self, now=None):
+        """公開済み記事のみを取得（nowを渡すとその時刻を基準にする）"""
+        return self.filter(status='published', published_at__lte=now or timezone.now())
     
     def drafts(self):
         """下書き記事のみを取得"""
@@ -68,6 +115,10 @@ class Article(models.Model):
     slug = models.SlugField('スラグ', max_length=200, unique=True, blank=True)
     excerpt = models.TextField('要約', max_length=300, blank=True)
     content = models.TextField('本文')
+    # 本文のHTML変換結果（contentのハッシュが変わった時のみ再生成）
+    content_html_cached = models.TextField('本文HTMLキャッシュ', blank=True, editable=False)
+    content_hash = models.CharField('本文ハッシュ', max_length=64, blank=True, editable=False)
+    reading_time = models.PositiveIntegerField('読了時間（分）', default=1, editable=False)
     author = models.ForeignKey(
         User, 
         verbose_name='著者', 
@@ -102,6 +153,8 @@ class Article(models.Model):
     view_count = models.PositiveIntegerField('表示回数', default=0)
     like_count = models.PositiveIntegerField('いいね数', default=0)
     share_count = models.PositiveIntegerField('シェア数', default=0)
+    # 承認済みコメント数（コメントの承認・削除時にシグナルで更新）
+    comment_count = models.PositiveIntegerField('コメント数', default=0, editable=False)
     
     # 日時情報
     published_at = models.DateTimeField('公開日時', null=True, blank=True)
@@ -123,8 +176,33 @@ class Article(models.Model):
         indexes = [
             models.Index(fields=['status', 'published_at']),
             models.Index(fields=['author', 'status']),
+            models.Index(fields=['status', 'is_pinned', '-published_at']),
+            models.Index(fields=['status', 'is_featured', '-published_at']),
+            models.Index(fields=['status', '-view_count', '-id']),
+            models.Index(fields=['status', '-published_at', '-id']),
+            models.Index(fields=['author', '-created_at']),
         ]
     
+    @classmethod
+    def update_comment_counts(cls, article_ids):
+        """指定記事の承認済みコメント数を1回のUPDATEで再集計"""
+        if not article_ids:
+            return
+        Comment = cls._meta.get_field('comments').related_model
+        approved = Comment.objects.filter(
+            article=models.OuterRef('pk'), is_approved=True
+        ).order_by().values('article').annotate(count=models.Count('pk')).values('count')
+        cls.objects.filter(pk__in=article_ids).update(
+            comment_count=Coalesce(models.Subquery(approved), 0)
+        )
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # タグの公開記事数の更新判定用に、読み込み時の状態を保持
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+    
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
@@ -140,8 +218,25 @@ class Article(models.Model):
         if not self.meta_description and self.excerpt:
             self.meta_description = self.excerpt[:160]
         
+        # 本文が保存対象の場合のみHTMLキャッシュを更新
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.update_content_cache()
+        elif 'content' in update_fields and self.update_content_cache():
+            kwargs['update_fields'] = {*update_fields, 'content_html_cached', 'content_hash', 'reading_time'}
+        
         super().save(*args, **kwargs)
     
+    def update_content_cache(self):
+        """本文が変更されていればHTMLキャッシュと読了時間を再計算（更新した場合はTrue）"""
+        content_hash = hashlib.sha1(self.content.encode('utf-8')).hexdigest()
+        if content_hash == self.content_hash:
+            return False
+        self.content_html_cached = render_markdown(self.content)
+        self.content_hash = content_hash
+        self.reading_time = calculate_reading_time(self.content)
+        return True
+    
     def __str__(self):
         return self.title
     
@@ -150,38 +245,36 @@ class Article(models.Model):
     
     @property
     def is_published(self):
-        return self.status == 'published' and self.published_at <= timezone.now()
+        return self.is_published_at(timezone.now())
     
-    @property
-    def content_html(self):
-        """MarkdownをHTMLに変換"""
-        return mark_safe(markdown.markdown(
-            self.content,
-            extensions=['markdown.extensions.codehilite', 'markdown.extensions.fenced_code']
-        ))
+    def is_published_at(self, now):
+        """指定時刻時点で公開済みかどうか"""
+        return self.status == 'published' and self.published_at <= now
     
     @property
-    def reading_time(self):
-        """読了時間を計算（分）"""
-        words_per_minute = 200  # 日本語の平均読解速度
-        word_count = len(self.content.split())
-        return max(1, round(word_count / words_per_minute))
+    def content_html(self):
+        """MarkdownをHTMLに変換（保存時に生成したキャッシュを返す）"""
+        if not self.content_hash:
+            # キャッシュ未生成の既存記事
+            return mark_safe(render_markdown(self.content))
+        return mark_safe(self.content_html_cached)
     
-    def get_related_articles(self, limit=5):
+    def get_related_articles(self, limit=5, now=None):
         """関連記事を取得（タグベースで検索）"""
-        if not self.tags.exists():
-            return Article.objects.published().exclude(id=self.id)[:limit]
+        # 先読み済みのタグがあれば追加クエリなしで参照する
+        tag_ids = [tag.id for tag in self.tags.all()]
+        if not tag_ids:
+            return Article.objects.published(now).exclude(id=self.id)[:limit]
         
         # 共通のタグを持つ記事を取得
-        tag_ids = list(self.tags.values_list('id', flat=True))
-        return Article.objects.published().filter(
+        return Article.objects.published(now).filter(
             tags__in=tag_ids
         ).exclude(id=self.id).distinct()[:limit]
     
     def increment_view_count(self):
-        """表示回数をインクリメント"""
+        """表示回数をインクリメント（DB側で加算し、同時アクセスでも取りこぼさない）"""
+        type(self).objects.filter(pk=self.pk).update(view_count=models.F('view_count') + 1)
         self.view_count += 1
-        self.save(update_fields=['view_count'])
 
 
 class ArticleLike(models.Model):
@@ -196,6 +289,9 @@ class ArticleLike(models.Model):
         verbose_name = '記事いいね'
         verbose_name_plural = '記事いいね'
         db_table = 'blog_article_like'
+        indexes = [
+            models.Index(fields=['user', 'article']),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.article.title}"
@@ -216,6 +312,8 @@ class ArticleView(models.Model):
         db_table = 'blog_article_view'
         indexes = [
             models.Index(fields=['article', 'created_at']),
+            models.Index(fields=['article', 'ip_address']),
+            models.Index(fields=['article', 'user']),
         ]
     
     def __str__(self):
@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PopularArticlePagination(CursorPagination):
+    """人気記事一覧用のカーソルページネーション（閲覧数順）"""
+    
+    ordering = ('-view_count', '-id')
+
+
+class RecentArticlePagination(CursorPagination):
+    """最新記事一覧用のカーソルページネーション（公開日時順）"""
+    
+    ordering = ('-published_at', '-id')
@@ -17,7 +17,7 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
             return True
         
         # 著者本人のみが自分の記事を編集可能
-        return obj.author == request.user
+        return obj.author_id == request.user.id
 
 
 class CanPublishOrReadOnly(permissions.BasePermission):
@@ -88,4 +88,4 @@ class IsAuthorOrAdmin(permissions.BasePermission):
             return True
         
         # 著者本人のみアクセス可能
-        return obj.author == request.user 
\ No newline at end of file
+        return obj.author_id == request.user.id 
\ No newline at end of file
@@ -1,8 +1,48 @@
 from rest_framework import serializers
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Value, BooleanField
+from django.utils.encoding import filepath_to_uri
 from django.utils.text import slugify
-from .models import Article, Tag, ArticleLike, ArticleView
+from .models import Article, Tag, ArticleLike, ArticleView, AUTHOR_SUMMARY_CACHE_KEY, RELATED_ARTICLES_CACHE_KEY
 from accounts.serializers import UserSerializer
 
+# 関連記事IDのキャッシュ保持時間（秒）
+RELATED_ARTICLES_CACHE_TIMEOUT = 60 * 60
+# 記事一覧用の著者情報のキャッシュ保持時間（秒）
+AUTHOR_SUMMARY_CACHE_TIMEOUT = 5 * 60
+
+
+# 記事一覧では使わない大きな列（一覧系のクエリでは読み込まない）
+ARTICLE_LIST_DEFERRED_FIELDS = ('content', 'content_html_cached')
+
+
+def build_author_summary(user):
+    """記事一覧で表示する著者情報のみの辞書を作成"""
+    return {
+        'id': user.id,
+        'username': user.username,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'role': user.role,
+        'avatar': settings.MEDIA_URL + filepath_to_uri(user.avatar.name) if user.avatar else None,
+    }
+
+
+def with_article_relations(queryset):
+    """著者（プロフィール含む）をJOINし、タグを先読み"""
+    return queryset.select_related('author', 'author__profile').prefetch_related('tags')
+
+
+def annotate_article_stats(queryset, user):
+    """いいね済みフラグを付与（承認済みコメント数は記事の comment_count 列を使う）"""
+    if user.is_authenticated:
+        is_liked = Exists(ArticleLike.objects.filter(article=OuterRef('pk'), user=user))
+    else:
+        is_liked = Value(False, output_field=BooleanField())
+    return queryset.annotate(is_liked_flag=is_liked)
+
 
 class TagSerializer(serializers.ModelSerializer):
     """タグシリアライザー"""
@@ -11,21 +51,19 @@ class TagSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Tag
-        fields = '__all__'
-        read_only_fields = ['created_at']
+        fields = ['id', 'name', 'slug', 'description', 'color', 'article_count']
     
     def get_article_count(self, obj):
-        return obj.get_article_count()
+        return obj.published_article_count
 
 
 class ArticleListSerializer(serializers.ModelSerializer):
     """記事一覧用シリアライザー"""
     
-    author = UserSerializer(read_only=True)
+    author = serializers.SerializerMethodField()
     tags = TagSerializer(many=True, read_only=True)
     reading_time = serializers.ReadOnlyField()
     is_liked = serializers.SerializerMethodField()
-    comment_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Article
@@ -36,15 +74,26 @@ class ArticleListSerializer(serializers.ModelSerializer):
             'updated_at', 'is_featured', 'is_pinned', 'reading_time', 'is_liked'
         ]
     
+    def get_author(self, obj):
+        """著者情報（ユーザー単位でキャッシュ）"""
+        author = cache.get_or_set(
+            AUTHOR_SUMMARY_CACHE_KEY.format(obj.author_id),
+            lambda: build_author_summary(obj.author),
+            AUTHOR_SUMMARY_CACHE_TIMEOUT
+        )
+        request = self.context.get('request')
+        if author['avatar'] and request is not None:
+            author = {**author, 'avatar': request.build_absolute_uri(author['avatar'])}
+        return author
+    
     def get_is_liked(self, obj):
+        # ビュー側で集計済みの場合は追加クエリを発行しない
+        if hasattr(obj, 'is_liked_flag'):
+            return obj.is_liked_flag
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.likes.filter(user=request.user).exists()
         return False
-    
-    def get_comment_count(self, obj):
-        """承認済みコメント数を取得"""
-        return obj.comments.filter(is_approved=True).count()
 
 
 class ArticleDetailSerializer(serializers.ModelSerializer):
@@ -56,7 +105,6 @@ class ArticleDetailSerializer(serializers.ModelSerializer):
     reading_time = serializers.ReadOnlyField()
     is_liked = serializers.SerializerMethodField()
     related_articles = serializers.SerializerMethodField()
-    comment_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Article
@@ -71,18 +119,36 @@ class ArticleDetailSerializer(serializers.ModelSerializer):
         ]
     
     def get_is_liked(self, obj):
+        # ビュー側で集計済みの場合は追加クエリを発行しない
+        if hasattr(obj, 'is_liked_flag'):
+            return obj.is_liked_flag
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.likes.filter(user=request.user).exists()
         return False
     
     def get_related_articles(self, obj):
-        related = obj.get_related_articles()
+        request = self.context.get('request')
+        user = request.user if request else AnonymousUser()
+        now = getattr(request, 'now', None)
+        
+        # 関連記事のID一覧のみキャッシュし、記事本体は一覧と同じ先読み付きで1回で取得
+        article_ids = cache.get_or_set(
+            RELATED_ARTICLES_CACHE_KEY.format(obj.pk),
+            lambda: list(obj.get_related_articles(now=now).values_list('pk', flat=True)),
+            RELATED_ARTICLES_CACHE_TIMEOUT
+        )
+        if not article_ids:
+            return []
+        
+        related = annotate_article_stats(
+            with_article_relations(
+                Article.objects.published(now).filter(pk__in=article_ids).defer(*ARTICLE_LIST_DEFERRED_FIELDS)
+            ),
+            user
+        )
+        related = sorted(related, key=lambda article: article_ids.index(article.pk))
         return ArticleListSerializer(related, many=True, context=self.context).data
-    
-    def get_comment_count(self, obj):
-        """承認済みコメント数を取得"""
-        return obj.comments.filter(is_approved=True).count()
 
 
 class ArticleCreateUpdateSerializer(serializers.ModelSerializer):
@@ -115,31 +181,35 @@ class ArticleCreateUpdateSerializer(serializers.ModelSerializer):
     
     def _process_tags(self, tag_data):
         """タグデータを処理して、Tagオブジェクトのリストを返す"""
-        tags = []
+        # 既存タグID（数値・数値文字列）と新規タグ名（文字列）に振り分け
+        tag_ids = []
+        names = []
         for item in tag_data:
-            if isinstance(item, str):
-                # 文字列の場合、新しいタグとして作成または既存タグを検索
-                if item.isdigit():
-                    # 数値文字列の場合はIDとして扱う
-                    try:
-                        tag = Tag.objects.get(id=int(item))
-                        tags.append(tag)
-                    except Tag.DoesNotExist:
-                        continue
-                else:
-                    # タグ名として処理
-                    tag, created = Tag.objects.get_or_create(
-                        name=item,
-                        defaults={'slug': slugify(item)}
-                    )
-                    tags.append(tag)
-            elif isinstance(item, int):
-                # 整数の場合、既存タグのIDとして処理
-                try:
-                    tag = Tag.objects.get(id=item)
-                    tags.append(tag)
-                except Tag.DoesNotExist:
-                    continue
+            if isinstance(item, int) or (isinstance(item, str) and item.isdigit()):
+                tag_ids.append(int(item))
+            elif isinstance(item, str):
+                names.append(item)
+        
+        # 存在しないIDは無視
+        tags = list(Tag.objects.in_bulk(tag_ids).values()) if tag_ids else []
+        
+        if names:
+            existing = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+            missing = [name for name in dict.fromkeys(names) if name not in existing]
+            if missing:
+                # 同時作成による重複は無視し、作成後に取得し直す
+                Tag.objects.bulk_create(
+                    [Tag(name=name, slug=slugify(name)) for name in missing],
+                    ignore_conflicts=True
+                )
+                existing.update({tag.name: tag for tag in Tag.objects.filter(name__in=missing)})
+                # スラグが既存タグと重複して作成されなかったタグ名はエラーにする
+                conflicts = [name for name in missing if name not in existing]
+                if conflicts:
+                    raise serializers.ValidationError({
+                        'tag_ids': [f"タグ「{name}」のスラグが既存のタグと重複しています。" for name in conflicts]
+                    })
+            tags.extend(existing.values())
         return tags
     
     def create(self, validated_data):
@@ -149,17 +219,20 @@ class ArticleCreateUpdateSerializer(serializers.ModelSerializer):
         if not validated_data.get('slug'):
             validated_data['slug'] = slugify(validated_data['title'])
         
+        # タグの作成に失敗した場合に記事だけが保存されないよう、先にタグを処理
+        tags = self._process_tags(tag_data) if tag_data else None
+        
         article = Article.objects.create(**validated_data)
         
-        # タグを処理・設定
-        if tag_data:
-            tags = self._process_tags(tag_data)
+        # タグを設定
+        if tags:
             article.tags.set(tags)
         
         return article
     
     def update(self, instance, validated_data):
         tag_data = validated_data.pop('tag_ids', None)
+        tags = self._process_tags(tag_data) if tag_data is not None else None
         
         # 記事を更新
         for attr, value in validated_data.items():
@@ -167,8 +240,7 @@ class ArticleCreateUpdateSerializer(serializers.ModelSerializer):
         instance.save()
         
         # タグを更新
-        if tag_data is not None:
-            tags = self._process_tags(tag_data)
+        if tags is not None:
             instance.tags.set(tags)
         
         return instance
@@ -0,0 +1,131 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from comments.models import Comment
+from .models import Article, Tag, ARTICLE_PAGE_CACHE, AUTHOR_SUMMARY_CACHE_KEY, RELATED_ARTICLES_CACHE_KEY
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def invalidate_related_articles_on_article_change(sender, instance, **kwargs):
+    """記事の更新・削除時に関連記事キャッシュを破棄"""
+    cache.delete(RELATED_ARTICLES_CACHE_KEY.format(instance.pk))
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def invalidate_related_articles_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """記事のタグ変更時に関連記事キャッシュを破棄"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        article_ids = [instance.pk]
+    elif pk_set:
+        article_ids = list(pk_set)
+    else:
+        # タグ側からのclear()では対象記事が分からないため、ここでは何もしない（TTLで失効）
+        return
+    cache.delete_many([RELATED_ARTICLES_CACHE_KEY.format(article_id) for article_id in article_ids])
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def update_tag_counts_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """記事とタグの紐付け変更時にタグの公開記事数を更新"""
+    if action == 'pre_clear':
+        # clear()後は対象タグが分からないため、削除前に控えておく
+        instance._cleared_tag_ids = [instance.pk] if reverse else list(
+            instance.tags.values_list('pk', flat=True)
+        )
+        return
+    
+    if action == 'post_clear':
+        tag_ids = instance.__dict__.pop('_cleared_tag_ids', [])
+    elif action in ('post_add', 'post_remove'):
+        if reverse:
+            tag_ids = [instance.pk]
+        elif instance.status == 'published':
+            tag_ids = list(pk_set or ())
+        else:
+            # 非公開記事の紐付けは公開記事数に影響しない
+            return
+    else:
+        return
+    Tag.update_published_article_counts(tag_ids)
+
+
+@receiver(post_save, sender=Article)
+def update_tag_counts_on_status_change(sender, instance, created, update_fields, **kwargs):
+    """記事の公開状態が変わった時にタグの公開記事数を更新"""
+    loaded_status = instance.__dict__.get('_loaded_status')
+    instance._loaded_status = instance.status
+    # 新規作成時はまだタグが紐付いていない
+    if created or (update_fields is not None and 'status' not in update_fields):
+        return
+    if loaded_status == instance.status:
+        return
+    if 'published' not in (loaded_status, instance.status):
+        return
+    Tag.update_published_article_counts(list(instance.tags.values_list('pk', flat=True)))
+
+
+@receiver(pre_delete, sender=Article)
+def remember_tags_before_article_delete(sender, instance, **kwargs):
+    """削除後に公開記事数を更新できるよう、削除前にタグを控える"""
+    if instance.status == 'published':
+        instance._deleted_tag_ids = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Article)
+def update_tag_counts_on_article_delete(sender, instance, **kwargs):
+    """公開記事の削除時にタグの公開記事数を更新"""
+    Tag.update_published_article_counts(instance.__dict__.pop('_deleted_tag_ids', []))
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_count_on_comment_save(sender, instance, created, update_fields, **kwargs):
+    """コメントの作成・承認状態の変更時に記事の承認済みコメント数を更新"""
+    loaded_is_approved = instance.__dict__.get('_loaded_is_approved')
+    instance._loaded_is_approved = instance.is_approved
+    if created:
+        delta = 1 if instance.is_approved else 0
+    elif update_fields is not None and 'is_approved' not in update_fields:
+        return
+    elif loaded_is_approved is None:
+        # 読み込み時の承認状態が分からない場合は再集計する
+        Article.update_comment_counts([instance.article_id])
+        return
+    else:
+        delta = int(instance.is_approved) - int(loaded_is_approved)
+    if delta:
+        Article.objects.filter(pk=instance.article_id).update(comment_count=F('comment_count') + delta)
+
+
+@receiver(post_delete, sender=Comment)
+def update_comment_count_on_comment_delete(sender, instance, **kwargs):
+    """承認済みコメントの削除時に記事の承認済みコメント数を減らす"""
+    if instance.is_approved:
+        Article.objects.filter(pk=instance.article_id, comment_count__gt=0).update(
+            comment_count=F('comment_count') - 1
+        )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_author_summary(sender, instance, **kwargs):
+    """ユーザー情報の更新時に記事一覧用の著者情報キャッシュを破棄"""
+    cache.delete(AUTHOR_SUMMARY_CACHE_KEY.format(instance.pk))
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(m2m_changed, sender=Article.tags.through)
+def invalidate_article_pages(sender, **kwargs):
+    """記事・タグの変更時に記事一覧APIのレスポンスキャッシュを破棄"""
+    action = kwargs.get('action')
+    if action is None or action.startswith('post_'):
+        caches[ARTICLE_PAGE_CACHE].clear()
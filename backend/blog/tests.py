@@ -0,0 +1,162 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+
+from .models import ARTICLE_PAGE_CACHE, Article, ArticleView, Tag
+from .tracking import MAX_FLUSH_RETRIES, ArticleActivityRecorder
+
+
+class ArticleActivityRecorderTests(TestCase):
+    """記事閲覧バッファのテスト"""
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='password'
+        )
+        self.article = Article.objects.create(
+            title='記事A', slug='article-a', content='本文', author=self.author, status='published'
+        )
+        # テスト中にタイマーで書き込まれないよう十分に長い間隔にする
+        self.recorder = ArticleActivityRecorder(flush_interval=3600)
+
+    def create_article(self, slug):
+        return Article.objects.create(
+            title=slug, slug=slug, content='本文', author=self.author, status='published'
+        )
+
+    def test_flush_writes_views_and_counts(self):
+        """閲覧履歴と閲覧数がまとめて書き込まれる"""
+        self.recorder.record(self.article.pk, self.author.pk, '127.0.0.1')
+        self.recorder.record(self.article.pk, None, '127.0.0.2')
+        self.recorder.flush()
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 2)
+        self.assertEqual(ArticleView.objects.filter(article=self.article).count(), 2)
+
+    def test_flush_skips_deleted_article(self):
+        """記録後に削除された記事の閲覧は破棄し、他の記事の閲覧は書き込む"""
+        deleted = self.create_article('article-b')
+        self.recorder.record(deleted.pk, None, '127.0.0.1')
+        deleted.delete()
+        self.recorder.record(self.article.pk, None, '127.0.0.1')
+        self.recorder.flush()
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 1)
+        self.assertEqual(ArticleView.objects.count(), 1)
+        self.assertEqual(self.recorder._views, [])
+
+    def test_flush_skips_deleted_user(self):
+        """記録後に削除されたユーザーの閲覧履歴は作らない"""
+        viewer = User.objects.create_user(
+            username='viewer', email='viewer@example.com', password='password'
+        )
+        self.recorder.record(self.article.pk, viewer.pk, '127.0.0.1')
+        viewer.delete()
+        self.recorder.flush()
+
+        self.assertFalse(ArticleView.objects.exists())
+
+    def test_failed_batch_is_dropped_after_retries(self):
+        """書き込みに失敗し続けるバッファは上限回数の後に破棄される"""
+        self.recorder.record(self.article.pk, None, '127.0.0.1')
+        with mock.patch.object(ArticleView.objects, 'bulk_create', side_effect=RuntimeError):
+            for _ in range(MAX_FLUSH_RETRIES):
+                with self.assertRaises(RuntimeError):
+                    self.recorder.flush()
+                self.assertEqual(len(self.recorder._views), 1)
+            with self.assertRaises(RuntimeError), self.assertLogs('blog.tracking', 'ERROR'):
+                self.recorder.flush()
+        self.assertEqual(self.recorder._views, [])
+
+        self.recorder.record(self.article.pk, None, '127.0.0.2')
+        self.recorder.flush()
+        self.assertEqual(ArticleView.objects.count(), 1)
+
+
+class ArticleTagTests(APITestCase):
+    """記事作成時のタグ処理のテスト"""
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='password'
+        )
+        self.client.force_authenticate(self.author)
+        Tag.objects.create(name='C++', slug='c')
+
+    def post_article(self, tag_ids):
+        return self.client.post(reverse('blog:articles-list'), {
+            'title': 'Article', 'slug': 'article', 'content': '本文', 'tag_ids': tag_ids,
+        }, format='json')
+
+    def test_new_tags_are_created(self):
+        """新しいタグ名はタグとして作成される"""
+        response = self.post_article(['Python', 'Django'])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        article = Article.objects.get(slug='article')
+        self.assertEqual({tag.name for tag in article.tags.all()}, {'Python', 'Django'})
+
+    def test_slug_conflict_is_rejected(self):
+        """スラグが既存タグと重複するタグ名はエラーになり、記事も作成されない"""
+        response = self.post_article(['Python', 'C'])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('tag_ids', response.data)
+        self.assertFalse(Article.objects.filter(slug='article').exists())
+
+
+class ArticlePageCacheTests(APITestCase):
+    """記事一覧レスポンスキャッシュのテスト"""
+
+    def setUp(self):
+        caches[ARTICLE_PAGE_CACHE].clear()
+        author = User.objects.create_user(
+            username='author', email='author@example.com', password='password'
+        )
+        Article.objects.create(
+            title='記事A', slug='article-a', content='本文', author=author,
+            status='published', is_featured=True
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(author)}')
+
+    def test_cached_on_server_only(self):
+        """サーバー側でキャッシュし、クライアントにはキャッシュさせない"""
+        url = reverse('blog:articles-featured')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('no-store', response['Cache-Control'])
+        self.assertIn('max-age=0', response['Cache-Control'])
+
+
+class SiteAnalyticsCacheTests(APITestCase):
+    """サイト統計APIのキャッシュのテスト"""
+
+    def setUp(self):
+        caches['default'].clear()
+        admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='password', role='admin'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}')
+
+    def test_cached_on_server_only(self):
+        """集計結果はサーバー側でのみキャッシュし、クライアントにはキャッシュさせない"""
+        url = reverse('blog:site-analytics')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('no-store', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
@@ -0,0 +1,177 @@
+"""
+記事閲覧の記録をプロセス内にバッファし、まとめてDBへ書き込む
+
+閲覧のたびに INSERT / UPDATE を発行せず、ArticleView の一括INSERTと
+記事ごとの閲覧数の加算をまとめて行う。バッファは件数が上限に達した時、
+または最初の記録から flush_interval 秒後にタイマーで書き込まれる。
+重複不可の閲覧は共有キャッシュの cache.add で記録済みかを判定し、
+既に記録済みのものは閲覧履歴の行をバッファに積まない。
+"""
+
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import F
+
+from .models import Article, ArticleView
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+VIEW_SEEN_CACHE_KEY = 'article_view_seen:{}:{}:{}'
+VIEW_SEEN_CACHE_TIMEOUT = 60 * 60 * 24
+# 書き込みに失敗したバッファを持ち越す最大回数（超えた場合は破棄してログに残す）
+MAX_FLUSH_RETRIES = 3
+
+
+class ArticleActivityRecorder:
+    """記事閲覧のバッファ"""
+
+    def __init__(self, max_size=100, flush_interval=5.0):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._views = []
+        self._view_counts = Counter()
+        self._timer = None
+        self._failures = 0
+
+    def record(self, article_id, user_id, ip_address, user_agent='', unique=False):
+        """閲覧を記録（unique=Trueの場合は同じ記事・ユーザー・IPの履歴を重複作成しない）"""
+        # 記録済みの閲覧は閲覧数のみ加算し、履歴の行は作らない
+        seen = unique and not cache.add(
+            VIEW_SEEN_CACHE_KEY.format(article_id, user_id, ip_address),
+            True,
+            VIEW_SEEN_CACHE_TIMEOUT
+        )
+        with self._lock:
+            self._view_counts[article_id] += 1
+            if not seen:
+                self._views.append((article_id, user_id, ip_address, user_agent, unique))
+            should_flush = len(self._views) + len(self._view_counts) >= self.max_size
+            if not should_flush:
+                self._schedule_flush()
+        if should_flush:
+            try:
+                self.flush()
+            except Exception:
+                # 集計の失敗で閲覧リクエスト自体を失敗させない（バッファは次回に持ち越す）
+                logger.exception('Failed to flush buffered article views')
+
+    def _schedule_flush(self):
+        """未書き込みの記録があり、タイマーが未設定ならflush_interval秒後の書き込みを予約（ロック内で呼ぶ）"""
+        if self._timer is None and self._view_counts:
+            self._timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_on_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Failed to flush buffered article views')
+        finally:
+            # タイマースレッドで開いたDB接続を閉じる
+            connections.close_all()
+
+    def flush(self):
+        """バッファ内容をDBへ書き込む
+
+        失敗した場合はバッファに戻して例外を送出する。MAX_FLUSH_RETRIES回続けて
+        失敗した場合は、後続の記録を妨げないよう持ち越した内容を破棄する。
+        """
+        with self._lock:
+            views, self._views = self._views, []
+            view_counts, self._view_counts = self._view_counts, Counter()
+
+        try:
+            with transaction.atomic():
+                # 記録後に削除された記事の閲覧は反映しない
+                article_ids = set(Article.objects.filter(
+                    pk__in=view_counts.keys() | {view[0] for view in views}
+                ).values_list('pk', flat=True))
+
+                # 閲覧数は記事ごとに合算して加算
+                for article_id, count in view_counts.items():
+                    if article_id in article_ids:
+                        Article.objects.filter(pk=article_id).update(view_count=F('view_count') + count)
+
+                if views:
+                    ArticleView.objects.bulk_create(self._build_view_rows(views, article_ids))
+        except Exception:
+            with self._lock:
+                self._failures += 1
+                if self._failures > MAX_FLUSH_RETRIES:
+                    self._failures = 0
+                    logger.error(
+                        'Dropped %d buffered article views after %d failed flushes',
+                        sum(view_counts.values()), MAX_FLUSH_RETRIES + 1
+                    )
+                else:
+                    # 記録済みとしてキャッシュ済みの閲覧を失わないよう、次回の書き込みに持ち越す
+                    self._views[:0] = views
+                    self._view_counts.update(view_counts)
+                self._schedule_flush()
+            raise
+        with self._lock:
+            self._failures = 0
+
+    def _build_view_rows(self, views, article_ids):
+        """閲覧履歴の行を作成（重複不可の記録はバッファ内・既存行と重複するものを除外）
+
+        キャッシュの期限切れや再起動後に同じ閲覧が届いた場合もここで除外される。
+        記録後に記事（article_ids に含まれないもの）や閲覧ユーザーが削除された行も除外する。
+        """
+        user_ids = {view[1] for view in views if view[1] is not None}
+        if user_ids:
+            user_ids = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+        views = [
+            view for view in views
+            if view[0] in article_ids and (view[1] is None or view[1] in user_ids)
+        ]
+
+        unique_keys = {
+            (article_id, user_id, ip_address)
+            for article_id, user_id, ip_address, _, unique in views if unique
+        }
+        existing = set()
+        if unique_keys:
+            existing = set(ArticleView.objects.filter(
+                article_id__in={key[0] for key in unique_keys},
+                ip_address__in={key[2] for key in unique_keys},
+            ).values_list('article_id', 'user_id', 'ip_address'))
+
+        rows = []
+        for article_id, user_id, ip_address, user_agent, unique in views:
+            if unique:
+                key = (article_id, user_id, ip_address)
+                if key in existing:
+                    continue
+                existing.add(key)
+            rows.append(ArticleView(
+                article_id=article_id,
+                user_id=user_id,
+                ip_address=ip_address,
+                user_agent=user_agent,
+            ))
+        return rows
+
+
+activity_recorder = ArticleActivityRecorder()
+
+
+@atexit.register
+def _flush_on_exit():
+    """プロセス終了時に未書き込みの閲覧を反映"""
+    try:
+        activity_recorder.flush()
+    except Exception:
+        logger.exception('Failed to flush buffered article activity')
@@ -3,6 +3,10 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     ArticleViewSet,
     TagViewSet,
+    FeaturedArticleListView,
+    PinnedArticleListView,
+    PopularArticleListView,
+    RecentArticleListView,
     PublicArticleListView,
     PublicArticleDetailView,
     user_analytics,
@@ -29,6 +33,12 @@ urlpatterns = [
     path('analytics/article/<int:article_id>/', article_analytics, name='article-analytics'),
     path('dashboard/', dashboard_data, name='dashboard-data'),
     
+    # 記事の固定一覧API（ルーターの詳細ルートより先に定義する）
+    path('articles/featured/', FeaturedArticleListView.as_view(), name='articles-featured'),
+    path('articles/pinned/', PinnedArticleListView.as_view(), name='articles-pinned'),
+    path('articles/popular/', PopularArticleListView.as_view(), name='articles-popular'),
+    path('articles/recent/', RecentArticleListView.as_view(), name='articles-recent'),
+    
     # 管理API（認証必要）
     path('', include(router.urls)),
     
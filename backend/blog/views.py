@@ -1,15 +1,26 @@
-from django.shortcuts import render
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.shortcuts import get_object_or_404, render
+from django.utils.cache import add_never_cache_headers
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_page
+from django.views.decorators.vary import vary_on_headers
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from django.db import transaction
 from django.db.models import Q, F, Count, Sum, Avg
+from django.db.models.functions import TruncDate, TruncMonth
 from django.utils import timezone
+from django.utils.encoding import filepath_to_uri
 from datetime import datetime, timedelta
 from django.contrib.auth import get_user_model
-from .models import Article, Tag, ArticleLike, ArticleView
+from .models import Article, Tag, ArticleLike, ArticleView, ARTICLE_PAGE_CACHE
 from comments.models import Comment
 from .serializers import (
     ArticleListSerializer,
@@ -17,17 +28,89 @@ from .serializers import (
     ArticleCreateUpdateSerializer,
     TagSerializer,
     ArticleLikeSerializer,
-    ArticleViewSerializer
+    ArticleViewSerializer,
+    with_article_relations,
+    annotate_article_stats,
+    ARTICLE_LIST_DEFERRED_FIELDS,
 )
+from .pagination import PopularArticlePagination, RecentArticlePagination
 from .permissions import IsAuthorOrReadOnly, CanPublishOrReadOnly
+from .tracking import activity_recorder
 
 User = get_user_model()
 
 
+# 公開記事の固定一覧で共通の基本クエリセット（ユーザーに依存しない部分を一度だけ組み立てる）
+PUBLISHED_ARTICLES = with_article_relations(
+    Article.objects.filter(status='published').defer(*ARTICLE_LIST_DEFERRED_FIELDS)
+)
+
+
+def server_cache_only(view_func):
+    """cache_pageが付与するクライアント向けのキャッシュ指定を打ち消す
+
+    cache_pageの外側に適用し、キャッシュはサーバー側のみで行う（破棄が即座にクライアントへ反映される）。
+    未レンダリングのレスポンスではcache_pageの保存判定がレンダリング後に行われるため、
+    ヘッダーの変更もレンダリング後（保存判定の後）に行う。
+    """
+    def disable_client_cache(response):
+        if response.has_header('Expires'):
+            del response.headers['Expires']
+        add_never_cache_headers(response)
+    
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        response = view_func(*args, **kwargs)
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.add_post_render_callback(disable_client_cache)
+        else:
+            disable_client_cache(response)
+        return response
+    return wrapper
+
+
+def cache_article_page(timeout):
+    """記事一覧レスポンスをキャッシュ（認証ヘッダーごとに別キャッシュ、記事の更新時に破棄）"""
+    def decorator(view_func):
+        return server_cache_only(vary_on_headers('Authorization')(
+            cache_page(timeout, cache=ARTICLE_PAGE_CACHE)(view_func)
+        ))
+    return decorator
+
+
+def monthly_aggregate(queryset, date_field, months=12, **aggregates):
+    """直近monthsヶ月（今月を含む）の月別集計を1回のGROUP BYで取得し、古い順に返す
+
+    該当データのない月は0で埋める。
+    """
+    month_start = timezone.localtime().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    month_starts = [month_start]
+    for _ in range(months - 1):
+        month_start = (month_start - timedelta(days=1)).replace(day=1)
+        month_starts.append(month_start)
+    month_starts.reverse()
+
+    rows = queryset.filter(**{f'{date_field}__gte': month_starts[0]}).annotate(
+        month=TruncMonth(date_field)
+    ).values('month').annotate(**aggregates).order_by('month')
+    # タイムゾーン情報のないMySQLではTruncMonthがNULLを返すため、その行は集計に含めない
+    totals = {row['month'].strftime('%Y-%m'): row for row in rows if row['month'] is not None}
+
+    stats = []
+    for start in month_starts:
+        key = start.strftime('%Y-%m')
+        row = totals.get(key, {})
+        stats.append({'month': key, **{name: row.get(name) or 0 for name in aggregates}})
+    return stats
+
+
 class TagViewSet(ModelViewSet):
     """タグ管理API"""
     
-    queryset = Tag.objects.filter(is_active=True)
+    # シリアライザーで使う列のみ取得
+    queryset = Tag.objects.filter(is_active=True).only(
+        'id', 'name', 'slug', 'description', 'color', 'published_article_count'
+    )
     serializer_class = TagSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     search_fields = ['name', 'description']
@@ -54,50 +137,41 @@ class ArticleViewSet(ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly, CanPublishOrReadOnly]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['status', 'tags', 'author', 'is_featured', 'is_pinned']
-    search_fields = ['title', 'excerpt', 'content']
+    # 本文へのLIKE検索は全件走査になるため、タイトル・要約のみを対象にする
+    search_fields = ['title', 'excerpt']
     ordering_fields = ['published_at', 'created_at', 'updated_at', 'view_count', 'like_count']
     ordering = ['-published_at', '-created_at']
     
+    # 投稿者は自分の記事のみ扱えるアクション（管理者は全記事）
+    OWN_ARTICLE_ACTIONS = frozenset(['list', 'create', 'update', 'partial_update', 'destroy'])
+    
     def get_queryset(self):
         """ユーザーと記事の状態に応じてクエリセットを制限"""
-        queryset = Article.objects.all()
         user = self.request.user
+        action = self.action
+        queryset = Article.objects.all()
         
-        # 管理画面での記事一覧表示の場合（認証が必要なアクション）
-        if self.action in ['list'] and user.is_authenticated:
-            if user.is_admin:
-                # 管理者のみ全ての記事を管理可能
-                return queryset
-            else:
-                # 編集者・投稿者は自分の記事のみ管理可能
-                return queryset.filter(author=user)
+        # 関連データ・集計値は一覧・詳細の表示時のみ付与する（更新・削除・いいね等では不要）
+        if action in ('list', 'retrieve'):
+            queryset = annotate_article_stats(with_article_relations(queryset), user)
+            if action == 'list':
+                queryset = queryset.defer(*ARTICLE_LIST_DEFERRED_FIELDS)
         
-        # 記事詳細表示の場合
-        elif self.action == 'retrieve':
-            if user.is_authenticated:
-                if user.is_admin:
-                    # 管理者は全ての記事を閲覧可能
-                    return queryset
-                else:
-                    # 編集者は公開記事と自分の記事を閲覧可能
-                    return queryset.filter(
-                        Q(status='published') | Q(author=user)
-                    )
-            else:
-                # 未認証ユーザーは公開記事のみ
-                return queryset.filter(status='published')
+        # 未認証ユーザーは公開記事のみ
+        if not user.is_authenticated:
+            return queryset.filter(status='published')
+        
+        if action in self.OWN_ARTICLE_ACTIONS:
+            # 管理者は全ての記事、編集者・投稿者は自分の記事のみ管理可能
+            return queryset if user.is_admin else queryset.filter(author=user)
         
-        # 作成・編集・削除の場合
-        elif self.action in ['create', 'update', 'partial_update', 'destroy']:
-            if user.is_authenticated:
-                if user.is_admin:
-                    # 管理者のみ全ての記事を操作可能
-                    return queryset
-                else:
-                    # 編集者は自分の記事のみ操作可能
-                    return queryset.filter(author=user)
+        if action == 'retrieve':
+            # 管理者は全ての記事、編集者は公開記事と自分の記事を閲覧可能
+            if user.is_admin:
+                return queryset
+            return queryset.filter(Q(status='published') | Q(author=user))
         
-        # その他のアクション（未認証時など）
+        # その他のアクション
         return queryset.filter(status='published')
     
     def get_serializer_class(self):
@@ -125,56 +199,49 @@ class ArticleViewSet(ModelViewSet):
         """記事詳細取得時に閲覧数をカウント"""
         instance = self.get_object()
         
-        # 閲覧履歴を記録
-        if request.user.is_authenticated:
-            ArticleView.objects.get_or_create(
-                article=instance,
-                user=request.user,
-                ip_address=self.get_client_ip(request),
-                defaults={'user_agent': request.META.get('HTTP_USER_AGENT', '')}
-            )
-        else:
-            ArticleView.objects.get_or_create(
-                article=instance,
-                user=None,
-                ip_address=self.get_client_ip(request),
-                defaults={'user_agent': request.META.get('HTTP_USER_AGENT', '')}
-            )
-        
-        # 閲覧数をインクリメント
-        instance.increment_view_count()
+        # 閲覧履歴の記録と閲覧数の加算はバッファしてまとめて書き込む
+        activity_recorder.record(
+            instance.pk,
+            request.user.pk if request.user.is_authenticated else None,
+            request.client_ip,
+            request.META.get('HTTP_USER_AGENT', ''),
+            unique=True
+        )
+        instance.view_count += 1
         
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
-    def get_client_ip(self, request):
-        """クライアントのIPアドレスを取得"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
-    
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def like(self, request, pk=None):
         """記事にいいねを付ける/外す"""
         article = self.get_object()
         user = request.user
         
-        like, created = ArticleLike.objects.get_or_create(article=article, user=user)
+        with transaction.atomic():
+            like, created = ArticleLike.objects.get_or_create(article=article, user=user)
+            
+            # いいね数はDB側で加減算する（符号なしカラムのため0の時は減算しない）
+            articles = Article.objects.filter(pk=article.pk)
+            if not created:
+                # 既にいいねしている場合は削除
+                like.delete()
+                articles.filter(like_count__gt=0).update(like_count=F('like_count') - 1)
+            else:
+                # いいねを追加
+                articles.update(like_count=F('like_count') + 1)
         
         if not created:
-            # 既にいいねしている場合は削除
-            like.delete()
-            article.like_count = F('like_count') - 1
-            article.save(update_fields=['like_count'])
             return Response({'message': 'いいねを取り消しました。', 'liked': False})
-        else:
-            # いいねを追加
-            article.like_count = F('like_count') + 1
-            article.save(update_fields=['like_count'])
-            return Response({'message': 'いいねしました。', 'liked': True})
+        return Response({'message': 'いいねしました。', 'liked': True})
+    
+    def _get_flag_target(self, pk, field):
+        """フラグ切り替え対象の記事を必要な列のみで取得"""
+        article = get_object_or_404(
+            Article.objects.filter(status='published').only('id', 'author_id', field), pk=pk
+        )
+        self.check_object_permissions(self.request, article)
+        return article
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def toggle_featured(self, request, pk=None):
@@ -182,9 +249,11 @@ class ArticleViewSet(ModelViewSet):
         if not request.user.is_admin:
             raise permissions.PermissionDenied("この操作の権限がありません。")
         
-        article = self.get_object()
+        article = self._get_flag_target(pk, 'is_featured')
         article.is_featured = not article.is_featured
-        article.save(update_fields=['is_featured'])
+        Article.objects.filter(pk=article.pk).update(is_featured=article.is_featured)
+        # update()ではシグナルが発行されないため、一覧キャッシュを明示的に破棄
+        caches[ARTICLE_PAGE_CACHE].clear()
         
         return Response({
             'message': f"記事が{'注目記事' if article.is_featured else '通常記事'}に設定されました。",
@@ -197,57 +266,66 @@ class ArticleViewSet(ModelViewSet):
         if not request.user.is_admin:
             raise permissions.PermissionDenied("この操作の権限がありません。")
         
-        article = self.get_object()
+        article = self._get_flag_target(pk, 'is_pinned')
         article.is_pinned = not article.is_pinned
-        article.save(update_fields=['is_pinned'])
+        Article.objects.filter(pk=article.pk).update(is_pinned=article.is_pinned)
+        # update()ではシグナルが発行されないため、一覧キャッシュを明示的に破棄
+        caches[ARTICLE_PAGE_CACHE].clear()
         
         return Response({
             'message': f"記事が{'ピン留め' if article.is_pinned else 'ピン留め解除'}されました。",
             'is_pinned': article.is_pinned
         })
+
+
+class PublishedArticleListView(generics.ListAPIView):
+    """公開記事の固定一覧APIの基底クラス（注目・ピン留め・人気・最新）
     
-    @action(detail=False, methods=['get'])
-    def featured(self, request):
-        """注目記事一覧"""
-        articles = self.get_queryset().filter(is_featured=True, status='published')
-        page = self.paginate_queryset(articles)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(articles, many=True)
-        return Response(serializer.data)
+    ModelViewSetのアクション経由ではなく、フィルターを使わない専用ビューとして提供する。
+    """
     
-    @action(detail=False, methods=['get'])
-    def pinned(self, request):
-        """ピン留め記事一覧"""
-        articles = self.get_queryset().filter(is_pinned=True, status='published')
-        serializer = self.get_serializer(articles, many=True)
-        return Response(serializer.data)
+    serializer_class = ArticleListSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = []
     
-    @action(detail=False, methods=['get'])
-    def popular(self, request):
-        """人気記事一覧（閲覧数順）"""
-        articles = self.get_queryset().filter(status='published').order_by('-view_count')
-        page = self.paginate_queryset(articles)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(articles, many=True)
-        return Response(serializer.data)
+    def get_queryset(self):
+        return annotate_article_stats(self.filter_articles(PUBLISHED_ARTICLES.all()), self.request.user)
     
-    @action(detail=False, methods=['get'])
-    def recent(self, request):
-        """最新記事一覧"""
-        articles = self.get_queryset().filter(status='published').order_by('-published_at')
-        page = self.paginate_queryset(articles)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(articles, many=True)
-        return Response(serializer.data)
+    def filter_articles(self, queryset):
+        return queryset
+
+
+@method_decorator(cache_article_page(60 * 5), name='dispatch')
+class FeaturedArticleListView(PublishedArticleListView):
+    """注目記事一覧"""
+    
+    def filter_articles(self, queryset):
+        return queryset.filter(is_featured=True)
+
+
+@method_decorator(cache_article_page(60 * 5), name='dispatch')
+class PinnedArticleListView(PublishedArticleListView):
+    """ピン留め記事一覧"""
+    
+    pagination_class = None
+    
+    def filter_articles(self, queryset):
+        return queryset.filter(is_pinned=True)
+
+
+@method_decorator(cache_article_page(60), name='dispatch')
+class PopularArticleListView(PublishedArticleListView):
+    """人気記事一覧（閲覧数順）"""
+    
+    # OFFSETを使わないカーソル方式でページングする（並び順はページネーション側で指定）
+    pagination_class = PopularArticlePagination
+
+
+@method_decorator(cache_article_page(60), name='dispatch')
+class RecentArticleListView(PublishedArticleListView):
+    """最新記事一覧"""
+    
+    pagination_class = RecentArticlePagination
 
 
 # 個別のビューも必要に応じて作成
@@ -259,9 +337,18 @@ class PublicArticleListView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['tags', 'author', 'is_featured']
-    search_fields = ['title', 'excerpt', 'content']
+    # 本文へのLIKE検索は全件走査になるため、タイトル・要約のみを対象にする
+    search_fields = ['title', 'excerpt']
     ordering_fields = ['published_at', 'view_count', 'like_count']
     ordering = ['-published_at']
+    
+    @method_decorator(cache_article_page(settings.ARTICLE_PAGE_CACHE_TIMEOUT))
+    def dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+    
+    def get_queryset(self):
+        queryset = with_article_relations(super().get_queryset()).defer(*ARTICLE_LIST_DEFERRED_FIELDS)
+        return annotate_article_stats(queryset, self.request.user)
 
 
 class PublicArticleDetailView(generics.RetrieveAPIView):
@@ -272,32 +359,25 @@ class PublicArticleDetailView(generics.RetrieveAPIView):
     lookup_field = 'slug'
     permission_classes = [permissions.AllowAny]
     
+    def get_queryset(self):
+        queryset = with_article_relations(super().get_queryset())
+        return annotate_article_stats(queryset, self.request.user)
+    
     def retrieve(self, request, *args, **kwargs):
         """記事詳細取得時に閲覧数をカウント"""
         instance = self.get_object()
         
-        # 閲覧履歴を記録（未認証ユーザー用）
-        ArticleView.objects.create(
-            article=instance,
-            user=request.user if request.user.is_authenticated else None,
-            ip_address=self.get_client_ip(request),
-            user_agent=request.META.get('HTTP_USER_AGENT', '')
+        # 閲覧履歴の記録と閲覧数の加算はバッファしてまとめて書き込む
+        activity_recorder.record(
+            instance.pk,
+            request.user.pk if request.user.is_authenticated else None,
+            request.client_ip,
+            request.META.get('HTTP_USER_AGENT', '')
         )
-        
-        # 閲覧数をインクリメント
-        instance.increment_view_count()
+        instance.view_count += 1
         
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
-    
-    def get_client_ip(self, request):
-        """クライアントのIPアドレスを取得"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
 
 
 # 統計・分析API
@@ -309,14 +389,22 @@ def user_analytics(request):
     
     # 基本統計
     articles = Article.objects.filter(author=user, status='published')
-    total_articles = articles.count()
-    total_views = articles.aggregate(Sum('view_count'))['view_count__sum'] or 0
-    total_likes = articles.aggregate(Sum('like_count'))['like_count__sum'] or 0
-    total_comments = Comment.objects.filter(article__author=user, is_approved=True).count()
-    
-    # 最近30日の記事投稿数
     thirty_days_ago = timezone.now() - timedelta(days=30)
-    recent_articles = articles.filter(published_at__gte=thirty_days_ago).count()
+    published = Q(status='published')
+    article_stats = Article.objects.filter(author=user).aggregate(
+        total_articles=Count('id', filter=published),
+        total_views=Sum('view_count', filter=published),
+        total_likes=Sum('like_count', filter=published),
+        # 最近30日の記事投稿数
+        recent_articles=Count('id', filter=published & Q(published_at__gte=thirty_days_ago)),
+        # コメント数は非公開にした記事の分も含めて数える
+        total_comments=Sum('comment_count'),
+    )
+    total_articles = article_stats['total_articles']
+    total_views = article_stats['total_views'] or 0
+    total_likes = article_stats['total_likes'] or 0
+    recent_articles = article_stats['recent_articles']
+    total_comments = article_stats['total_comments'] or 0
     
     # 人気記事トップ5
     popular_articles = articles.order_by('-view_count')[:5].values(
@@ -329,22 +417,12 @@ def user_analytics(request):
     )
     
     # 月別統計（過去12ヶ月）
-    monthly_stats = []
-    for i in range(12):
-        month_start = (timezone.now().replace(day=1) - timedelta(days=i*30)).replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        month_articles = articles.filter(
-            published_at__gte=month_start,
-            published_at__lte=month_end
-        )
-        
-        monthly_stats.insert(0, {
-            'month': month_start.strftime('%Y-%m'),
-            'articles': month_articles.count(),
-            'views': month_articles.aggregate(Sum('view_count'))['view_count__sum'] or 0,
-            'likes': month_articles.aggregate(Sum('like_count'))['like_count__sum'] or 0,
-        })
+    monthly_stats = monthly_aggregate(
+        articles, 'published_at',
+        articles=Count('id'),
+        views=Sum('view_count'),
+        likes=Sum('like_count'),
+    )
     
     # タグ別統計
     tag_stats = articles.values('tags__name').annotate(
@@ -370,21 +448,29 @@ def user_analytics(request):
     })
 
 
+@server_cache_only
+@vary_on_headers('Authorization')
+@cache_page(60 * 5)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def site_analytics(request):
-    """サイト全体の統計データAPI（管理者のみ）"""
+    """サイト全体の統計データAPI（管理者のみ、集計結果は5分間キャッシュ）"""
     if not request.user.is_admin:
         return Response({'error': '権限がありません。'}, status=status.HTTP_403_FORBIDDEN)
     
     # 基本統計
     total_users = User.objects.filter(is_active=True).count()
-    total_articles = Article.objects.filter(status='published').count()
-    total_views = Article.objects.filter(status='published').aggregate(
-        Sum('view_count'))['view_count__sum'] or 0
-    total_likes = Article.objects.filter(status='published').aggregate(
-        Sum('like_count'))['like_count__sum'] or 0
-    total_comments = Comment.objects.filter(is_approved=True).count()
+    published = Q(status='published')
+    article_stats = Article.objects.aggregate(
+        total_articles=Count('id', filter=published),
+        total_views=Sum('view_count', filter=published),
+        total_likes=Sum('like_count', filter=published),
+        total_comments=Sum('comment_count'),
+    )
+    total_articles = article_stats['total_articles']
+    total_views = article_stats['total_views'] or 0
+    total_likes = article_stats['total_likes'] or 0
+    total_comments = article_stats['total_comments'] or 0
     total_tags = Tag.objects.count()
     
     # 最近30日の新規登録ユーザー
@@ -417,27 +503,13 @@ def site_analytics(request):
     )
     
     # 月別成長統計（過去12ヶ月）
-    growth_stats = []
-    for i in range(12):
-        month_start = (timezone.now().replace(day=1) - timedelta(days=i*30)).replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        month_users = User.objects.filter(
-            created_at__gte=month_start,
-            created_at__lte=month_end
-        ).count()
-        
-        month_articles = Article.objects.filter(
-            status='published',
-            published_at__gte=month_start,
-            published_at__lte=month_end
-        ).count()
-        
-        growth_stats.insert(0, {
-            'month': month_start.strftime('%Y-%m'),
-            'new_users': month_users,
-            'new_articles': month_articles,
-        })
+    user_growth = monthly_aggregate(User.objects.all(), 'created_at', new_users=Count('id'))
+    article_growth = monthly_aggregate(
+        Article.objects.filter(status='published'), 'published_at', new_articles=Count('id')
+    )
+    growth_stats = [
+        {**users, **articles} for users, articles in zip(user_growth, article_growth)
+    ]
     
     # タグ別記事統計
     tag_stats = Tag.objects.filter(is_active=True).annotate(
@@ -472,38 +544,42 @@ def site_analytics(request):
 def article_analytics(request, article_id):
     """個別記事の詳細分析API"""
     try:
-        article = Article.objects.get(id=article_id)
+        article = Article.objects.select_related('author').prefetch_related('tags').get(id=article_id)
     except Article.DoesNotExist:
         return Response({'error': '記事が見つかりません。'}, status=status.HTTP_404_NOT_FOUND)
     
     # 権限チェック：自分の記事または編集者以上
-    if article.author != request.user and not request.user.is_editor:
+    if article.author_id != request.user.id and not request.user.is_editor:
         return Response({'error': '権限がありません。'}, status=status.HTTP_403_FORBIDDEN)
     
     # 基本統計
     view_count = article.view_count
     like_count = article.like_count
-    comment_count = Comment.objects.filter(article=article, is_approved=True).count()
+    comment_count = article.comment_count
     
     # 日別閲覧数（過去30日）
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    daily_views = []
-    for i in range(30):
-        date = (timezone.now() - timedelta(days=i)).date()
-        views = ArticleView.objects.filter(
-            article=article,
-            created_at__date=date
-        ).count()
-        daily_views.insert(0, {
-            'date': date.strftime('%Y-%m-%d'),
-            'views': views
-        })
+    today = timezone.localdate()
+    dates = [today - timedelta(days=i) for i in range(29, -1, -1)]
+    views_by_date = dict(ArticleView.objects.filter(
+        article=article,
+        # 日付変換せずに比較し、(article, created_at) インデックスの範囲検索にする
+        created_at__gte=timezone.make_aware(datetime.combine(dates[0], datetime.min.time()))
+    ).annotate(date=TruncDate('created_at')).values('date').annotate(
+        views=Count('id')
+    ).order_by().values_list('date', 'views'))
+    daily_views = [
+        {'date': date.strftime('%Y-%m-%d'), 'views': views_by_date.get(date, 0)}
+        for date in dates
+    ]
     
     # 閲覧者統計
-    total_viewers = ArticleView.objects.filter(article=article).values('ip_address').distinct().count()
-    authenticated_viewers = ArticleView.objects.filter(
-        article=article, user__isnull=False
-    ).values('user').distinct().count()
+    viewer_stats = ArticleView.objects.filter(article=article).aggregate(
+        total_viewers=Count('ip_address', distinct=True),
+        # COUNT(DISTINCT) はNULLを数えないため匿名の閲覧は除外される
+        authenticated_viewers=Count('user', distinct=True),
+    )
+    total_viewers = viewer_stats['total_viewers']
+    authenticated_viewers = viewer_stats['authenticated_viewers']
     
     # 最近のコメント（5件）
     recent_comments = Comment.objects.filter(
@@ -513,16 +589,9 @@ def article_analytics(request, article_id):
     )
     
     # 関連記事のパフォーマンス比較（タグベース）
-    related_articles = article.get_related_articles(limit=5)
-    related_articles_data = []
-    for related in related_articles:
-        related_articles_data.append({
-            'id': related.id,
-            'title': related.title,
-            'slug': related.slug,
-            'view_count': related.view_count,
-            'like_count': related.like_count
-        })
+    related_articles_data = list(article.get_related_articles(limit=5).values(
+        'id', 'title', 'slug', 'view_count', 'like_count'
+    ))
     
     return Response({
         'article': {
@@ -565,43 +634,48 @@ def dashboard_data(request):
     recent_comments = Comment.objects.filter(
         article__author=user,
         is_approved=True
-    ).select_related('author', 'article').order_by('-created_at')[:5]
-    
-    # コメントデータの整形
-    comments_data = []
-    for comment in recent_comments:
-        comments_data.append({
-            'id': comment.id,
-            'content': comment.content[:100] + '...' if len(comment.content) > 100 else comment.content,
-            'author': {
-                'username': comment.author.username,
-                'avatar': comment.author.avatar.url if comment.author.avatar else None
-            },
-            'article': {
-                'id': comment.article.id,
-                'title': comment.article.title,
-                'slug': comment.article.slug
-            },
-            'created_at': comment.created_at
-        })
+    ).order_by('-created_at').values(
+        'id', 'content', 'created_at',
+        'author__username', 'author__avatar',
+        'article__id', 'article__title', 'article__slug'
+    )[:5]
+    
+    # コメントデータの整形（モデルを生成せず、アバターURLもMEDIA_URLから組み立てる）
+    comments_data = [{
+        'id': comment['id'],
+        'content': comment['content'][:100] + '...' if len(comment['content']) > 100 else comment['content'],
+        'author': {
+            'username': comment['author__username'],
+            'avatar': settings.MEDIA_URL + filepath_to_uri(comment['author__avatar'])
+            if comment['author__avatar'] else None
+        },
+        'article': {
+            'id': comment['article__id'],
+            'title': comment['article__title'],
+            'slug': comment['article__slug']
+        },
+        'created_at': comment['created_at']
+    } for comment in recent_comments]
     
     # 統計情報
-    total_articles = Article.objects.filter(author=user).count()
-    published_articles = Article.objects.filter(author=user, status='published').count()
-    draft_articles = Article.objects.filter(author=user, status='draft').count()
-    total_views = Article.objects.filter(author=user).aggregate(Sum('view_count'))['view_count__sum'] or 0
-    total_likes = Article.objects.filter(author=user).aggregate(Sum('like_count'))['like_count__sum'] or 0
-    total_comments = Comment.objects.filter(article__author=user, is_approved=True).count()
+    article_stats = Article.objects.filter(author=user).aggregate(
+        total_articles=Count('id'),
+        published_articles=Count('id', filter=Q(status='published')),
+        draft_articles=Count('id', filter=Q(status='draft')),
+        total_views=Sum('view_count'),
+        total_likes=Sum('like_count'),
+        total_comments=Sum('comment_count'),
+    )
     
     return Response({
         'recent_articles': list(recent_articles),
         'recent_comments': comments_data,
         'stats': {
-            'total_articles': total_articles,
-            'published_articles': published_articles,
-            'draft_articles': draft_articles,
-            'total_views': total_views,
-            'total_likes': total_likes,
-            'total_comments': total_comments
+            'total_articles': article_stats['total_articles'],
+            'published_articles': article_stats['published_articles'],
+            'draft_articles': article_stats['draft_articles'],
+            'total_views': article_stats['total_views'] or 0,
+            'total_likes': article_stats['total_likes'] or 0,
+            'total_comments': article_stats['total_comments'] or 0
         }
     })
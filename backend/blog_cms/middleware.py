@@ -0,0 +1,28 @@
+from django.utils import timezone
+
+
+class RequestTimeMiddleware:
+    """リクエスト開始時刻を request.now に保持（1リクエスト内で同じ現在時刻を使う）"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.now = timezone.now()
+        return self.get_response(request)
+
+
+class ClientIPMiddleware:
+    """クライアントのIPアドレスを1回だけ解析して request.client_ip に保持"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+        if x_forwarded_for:
+            # プロキシ経由の場合は先頭（クライアント側）のアドレスを使う
+            request.client_ip = x_forwarded_for.partition(',')[0].strip()
+        else:
+            request.client_ip = request.META.get('REMOTE_ADDR')
+        return self.get_response(request)
@@ -61,6 +61,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'blog_cms.middleware.RequestTimeMiddleware',
+    'blog_cms.middleware.ClientIPMiddleware',
 ]
 
 ROOT_URLCONF = 'blog_cms.urls'
@@ -158,6 +160,21 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache settings
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'default',
+    },
+    # 記事一覧APIのレスポンスキャッシュ（記事の更新時にまとめて破棄する）
+    'article_pages': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'article_pages',
+    },
+}
+
+ARTICLE_PAGE_CACHE_TIMEOUT = config('ARTICLE_PAGE_CACHE_TIMEOUT', default=60, cast=int)
+
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -174,7 +191,7 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'blog_cms.renderers.ORJSONRenderer',
     ],
 }
 
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.6 on 2026-10-15 21:19
+
+from django.db import migrations, models
+
+
+def backfill_depth(apps, schema_editor):
+    """既存コメントのネストレベルを親の階層ごとに一括更新（ルートは既定値の0）"""
+    Comment = apps.get_model('comments', 'Comment')
+    depth = 0
+    while Comment.objects.filter(parent__depth=depth, parent__isnull=False).update(depth=depth + 1):
+        depth += 1
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='ネストレベル'),
+        ),
+        migrations.RunPython(backfill_depth, migrations.RunPython.noop),
+    ]
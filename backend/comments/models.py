@@ -45,6 +45,8 @@ class Comment(models.Model):
         related_name='replies'
     )
     content = models.TextField('コメント内容')
+    # ネストレベル（親をたどらずに参照できるよう作成時に保存）
+    depth = models.PositiveSmallIntegerField('ネストレベル', default=0, editable=False)
     
     # モデレーション
     is_approved = models.BooleanField('承認済み', default=False)
@@ -63,6 +65,9 @@ class Comment(models.Model):
     updated_at = models.DateTimeField('更新日時', auto_now=True)
     edited_at = models.DateTimeField('編集日時', null=True, blank=True)
     
+    # 返信可能な最大ネストレベル
+    MAX_DEPTH = 3
+    
     objects = CommentManager()
     
     class Meta:
@@ -76,11 +81,36 @@ class Comment(models.Model):
             models.Index(fields=['author', 'created_at']),
         ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 編集判定用に、読み込み時の本文を保持（再取得のSELECTを避ける）
+        instance._loaded_content = instance.__dict__.get('content')
+        # 記事のコメント数の更新判定用に、読み込み時の承認状態を保持
+        instance._loaded_is_approved = instance.__dict__.get('is_approved')
+        return instance
+    
     def save(self, *args, **kwargs):
-        if self.pk and self.content != self.__class__.objects.get(pk=self.pk).content:
-            self.is_edited = True
-            self.edited_at = timezone.now()
+        if self._state.adding:
+            self.depth = self._get_parent_depth() + 1 if self.parent_id else 0
+        if self.pk:
+            loaded_content = getattr(self, '_loaded_content', None)
+            if loaded_content is None:
+                # 本文を読み込まずに取得したインスタンスのみDBの値と比較する
+                loaded_content = self.__class__.objects.filter(pk=self.pk).values_list(
+                    'content', flat=True
+                ).first()
+            if self.content != loaded_content:
+                self.is_edited = True
+                self.edited_at = timezone.now()
         super().save(*args, **kwargs)
+        self._loaded_content = self.content
+    
+    def _get_parent_depth(self):
+        """親コメントのネストレベル（読み込み済みの親があればクエリを発行しない）"""
+        if Comment.parent.is_cached(self):
+            return self.parent.depth
+        return Comment.objects.filter(pk=self.parent_id).values_list('depth', flat=True).get()
     
     def __str__(self):
         return f"{self.author.username} - {self.article.title}"
@@ -88,20 +118,13 @@ class Comment(models.Model):
     @property
     def is_reply(self):
         """返信コメントかどうか"""
-        return self.parent is not None
-    
-    @property
-    def depth(self):
-        """コメントのネストレベル"""
-        if not self.parent:
-            return 0
-        return self.parent.depth + 1
+        return self.parent_id is not None
     
     def get_replies(self):
         """このコメントに対する返信を取得"""
         return self.replies.filter(is_approved=True).order_by('created_at')
     
-    def can_reply(self, max_depth=3):
+    def can_reply(self, max_depth=MAX_DEPTH):
         """返信可能かどうか（最大ネストレベルをチェック）"""
         return self.depth < max_depth
     
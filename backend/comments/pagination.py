@@ -0,0 +1,11 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CommentCursorPagination(CursorPagination):
+    """コメント一覧用のカーソルページネーション（COUNTクエリを発行しない）
+
+    ビューにOrderingFilterがある場合は並び順はビュー側の指定に従う。
+    """
+    
+    page_size = 20
+    ordering = ('-created_at', '-id')
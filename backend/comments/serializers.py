@@ -1,17 +1,50 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import BooleanField, Count, Exists, IntegerField, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce
 from .models import Comment, CommentLike, CommentReport
-from accounts.serializers import UserSerializer
+from accounts.serializers import UserSerializer, annotate_user_counts
 
 User = get_user_model()
 
+# 返信可能な最大ネストレベル（シリアライズ時の属性参照を減らすためモジュールで保持）
+MAX_COMMENT_DEPTH = Comment.MAX_DEPTH
+# 公開用のコメント出力では使わない列（一覧・詳細のクエリでは読み込まない）
+COMMENT_DEFERRED_FIELDS = ('ip_address', 'user_agent')
+
+
+def annotate_is_liked(queryset, user):
+    """現在のユーザーがいいね済みかどうかをサブクエリで付与"""
+    if user.is_authenticated:
+        is_liked = Exists(CommentLike.objects.filter(comment=OuterRef('pk'), user=user))
+    else:
+        is_liked = Value(False, output_field=BooleanField())
+    return queryset.annotate(is_liked=is_liked)
+
+
+def prefetch_comment_author(lookup='author'):
+    """投稿者をプロフィール・記事数・コメント数の集計付きで先読み（UserSerializer用）"""
+    return Prefetch(lookup, queryset=annotate_user_counts(User.objects.select_related('profile')))
+
+
+# ユーザーに依存しない先読み設定はリクエストごとに組み立てず、読み込み時に1度だけ生成する
+COMMENT_AUTHOR_PREFETCH = prefetch_comment_author()
+# 返信ツリーの各階層の投稿者の先読み（階層順）
+REPLY_AUTHOR_PREFETCHES = tuple(
+    prefetch_comment_author('prefetched_replies__' * level + 'author')
+    for level in range(1, MAX_COMMENT_DEPTH + 1)
+)
+# 返信ツリーの各階層で読み込む返信（いいね済みはリクエストごとに付与）
+REPLY_QUERYSET = Comment.objects.filter(is_approved=True).defer(*COMMENT_DEFERRED_FIELDS).order_by('created_at')
+
 
 class CommentSerializer(serializers.ModelSerializer):
     """コメント一覧・詳細用シリアライザー"""
     
     author = UserSerializer(read_only=True)
     replies = serializers.SerializerMethodField()
-    is_liked = serializers.SerializerMethodField()
+    # setup_eager_loading でサブクエリにより付与（未付与の場合はFalse）
+    is_liked = serializers.BooleanField(read_only=True, default=False)
     can_reply = serializers.SerializerMethodField()
     
     class Meta:
@@ -27,26 +60,43 @@ class CommentSerializer(serializers.ModelSerializer):
             'like_count', 'created_at', 'updated_at', 'edited_at'
         ]
     
-    def get_replies(self, obj):
-        """子コメント（返信）を取得"""
-        if hasattr(obj, 'prefetched_replies'):
-            # prefetch_relatedを使用している場合
-            replies = obj.prefetched_replies
-        else:
-            replies = obj.get_replies()
+    @classmethod
+    def setup_eager_loading(cls, queryset, user):
+        """出力するフィールドに必要な関連データをまとめて読み込む
         
-        return CommentSerializer(replies, many=True, context=self.context).data
+        返信ツリーは最大ネストレベルまで階層ごとに先読みし、各階層の投稿者・いいね済みも含める。
+        """
+        replies = annotate_is_liked(REPLY_QUERYSET, user)
+        lookups = [COMMENT_AUTHOR_PREFETCH]
+        for level, author_prefetch in enumerate(REPLY_AUTHOR_PREFETCHES):
+            lookups.append(Prefetch(
+                'prefetched_replies__' * level + 'replies', queryset=replies, to_attr='prefetched_replies'
+            ))
+            lookups.append(author_prefetch)
+        queryset = queryset.defer(*COMMENT_DEFERRED_FIELDS)
+        return annotate_is_liked(queryset, user).prefetch_related(*lookups)
     
-    def get_is_liked(self, obj):
-        """現在のユーザーがいいねしているかどうか"""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.likes.filter(user=request.user).exists()
-        return False
+    def get_replies(self, obj):
+        """子コメント（返信）を取得（先読みした返信ツリーのみを使い、クエリを発行しない）"""
+        replies = getattr(obj, 'prefetched_replies', [])
+        return CommentSerializer(replies, many=True, context=self.context).data
     
     def get_can_reply(self, obj):
-        """返信可能かどうか"""
-        return obj.can_reply()
+        """返信可能かどうか（保存済みのネストレベルと比較するのみ）"""
+        return obj.depth < MAX_COMMENT_DEPTH
+
+
+class CommentFlatSerializer(CommentSerializer):
+    """返信をネストせずに1件ずつ出力するシリアライザー（ビュー側でツリーに組み立てる）"""
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset, user):
+        """投稿者といいね済みのみ読み込む（返信ツリーは先読みしない）"""
+        queryset = queryset.defer(*COMMENT_DEFERRED_FIELDS)
+        return annotate_is_liked(queryset, user).prefetch_related(COMMENT_AUTHOR_PREFETCH)
+    
+    def get_replies(self, obj):
+        return []
 
 
 class CommentCreateUpdateSerializer(serializers.ModelSerializer):
@@ -55,13 +105,17 @@ class CommentCreateUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ['article', 'parent', 'content']
+        # 親コメントは検証と深度の計算に使う列だけを読み込む
+        extra_kwargs = {
+            'parent': {'queryset': Comment.objects.only('id', 'article_id', 'depth')},
+        }
     
     def validate_parent(self, value):
         """親コメントの妥当性をチェック"""
         if value:
             # 親コメントが存在し、同じ記事に属するかチェック
             article = self.initial_data.get('article')
-            if article and value.article.id != int(article):
+            if article and value.article_id != int(article):
                 raise serializers.ValidationError(
                     "親コメントは同じ記事に属している必要があります。"
                 )
@@ -115,7 +169,8 @@ class CommentModerationSerializer(serializers.ModelSerializer):
     
     author = UserSerializer(read_only=True)
     article_title = serializers.CharField(source='article.title', read_only=True)
-    report_count = serializers.SerializerMethodField()
+    # setup_eager_loading で未解決の報告数を集計済み
+    report_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Comment
@@ -126,6 +181,17 @@ class CommentModerationSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['author', 'article', 'parent', 'created_at', 'updated_at']
     
-    def get_report_count(self, obj):
-        """報告数を取得"""
-        return obj.reports.filter(is_resolved=False).count() 
\ No newline at end of file
+    @classmethod
+    def setup_eager_loading(cls, queryset, user):
+        """投稿者・記事タイトル・未解決の報告数をまとめて読み込む"""
+        # 報告数は相関サブクエリで集計（JOIN+GROUP BYだとMeta.orderingが外れるため）
+        unresolved_reports = CommentReport.objects.filter(
+            comment=OuterRef('pk'), is_resolved=False
+        ).order_by().values('comment').annotate(count=Count('pk')).values('count')
+        # 記事はタイトルのみ使うため、本文の列は読み込まない
+        queryset = queryset.select_related('article').defer(
+            'user_agent', 'article__content', 'article__content_html_cached'
+        )
+        return queryset.prefetch_related(COMMENT_AUTHOR_PREFETCH).annotate(
+            report_count=Coalesce(Subquery(unresolved_reports, output_field=IntegerField()), 0)
+        )
@@ -5,10 +5,13 @@ from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter
-from django.db.models import Prefetch, F
-from .models import Comment, CommentLike, CommentReport
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from .models import Comment, CommentLike
+from .pagination import CommentCursorPagination
 from .serializers import (
     CommentSerializer,
+    CommentFlatSerializer,
     CommentCreateUpdateSerializer,
     CommentLikeSerializer,
     CommentReportSerializer,
@@ -26,21 +29,18 @@ class CommentViewSet(ModelViewSet):
     filterset_fields = ['article', 'parent', 'is_approved']
     ordering_fields = ['created_at', 'updated_at', 'like_count']
     ordering = ['created_at']
+    # 編集者は全コメント、一般ユーザーは承認済みコメントのみ表示
+    queryset = Comment.objects.all()
+    public_queryset = Comment.objects.filter(is_approved=True)
     
     def get_queryset(self):
         """クエリセットを取得"""
-        queryset = Comment.objects.select_related('author', 'article').prefetch_related(
-            Prefetch(
-                'replies',
-                queryset=Comment.objects.filter(is_approved=True).select_related('author').order_by('created_at'),
-                to_attr='prefetched_replies'
-            )
-        )
-        
-        # 一般ユーザーは承認済みコメントのみ表示
-        if not self.request.user.is_authenticated or not self.request.user.is_editor:
-            queryset = queryset.filter(is_approved=True)
-        
+        user = self.request.user
+        base = self.queryset if user.is_authenticated and user.is_editor else self.public_queryset
+        queryset = base.all()
+        # 返信ツリー・投稿者は一覧・詳細の表示時のみ読み込む（いいね・報告等では不要）
+        if self.action in ('list', 'retrieve'):
+            queryset = CommentSerializer.setup_eager_loading(queryset, user)
         return queryset
     
     def get_serializer_class(self):
@@ -52,7 +52,7 @@ class CommentViewSet(ModelViewSet):
     def perform_create(self, serializer):
         """コメント作成時の処理"""
         # IPアドレスとユーザーエージェントを取得
-        ip_address = self.get_client_ip(self.request)
+        ip_address = self.request.client_ip
         user_agent = self.request.META.get('HTTP_USER_AGENT', '')
         
         # 自動承認の判定（管理者・編集者は自動承認）
@@ -65,53 +65,42 @@ class CommentViewSet(ModelViewSet):
             is_approved=is_approved
         )
     
-    def get_client_ip(self, request):
-        """クライアントのIPアドレスを取得"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
-    
     @action(detail=True, methods=['post'])
     def like(self, request, pk=None):
         """コメントにいいね"""
         comment = self.get_object()
-        like, created = CommentLike.objects.get_or_create(
-            comment=comment,
-            user=request.user
-        )
-        
-        if created:
-            # いいね数を更新
-            Comment.objects.filter(pk=comment.pk).update(
-                like_count=F('like_count') + 1
-            )
-            return Response({'status': 'liked'}, status=status.HTTP_201_CREATED)
-        else:
+        try:
+            # 一意制約で重複を判定し、事前のSELECTを省く
+            with transaction.atomic():
+                CommentLike.objects.create(comment=comment, user=request.user)
+                # いいね数を更新
+                Comment.objects.filter(pk=comment.pk).update(
+                    like_count=F('like_count') + 1
+                )
+        except IntegrityError:
             return Response(
                 {'error': '既にいいねしています。'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
+        return Response({'status': 'liked'}, status=status.HTTP_201_CREATED)
     
     @action(detail=True, methods=['delete'])
     def unlike(self, request, pk=None):
         """コメントのいいねを取り消し"""
         comment = self.get_object()
-        try:
-            like = CommentLike.objects.get(comment=comment, user=request.user)
-            like.delete()
-            # いいね数を更新
-            Comment.objects.filter(pk=comment.pk).update(
-                like_count=F('like_count') - 1
-            )
-            return Response({'status': 'unliked'}, status=status.HTTP_200_OK)
-        except CommentLike.DoesNotExist:
+        with transaction.atomic():
+            deleted, _ = CommentLike.objects.filter(comment=comment, user=request.user).delete()
+            if deleted:
+                # いいね数を更新
+                Comment.objects.filter(pk=comment.pk).update(
+                    like_count=F('like_count') - 1
+                )
+        if not deleted:
             return Response(
                 {'error': 'いいねしていません。'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
+        return Response({'status': 'unliked'}, status=status.HTTP_200_OK)
     
     @action(detail=True, methods=['post'])
     def report(self, request, pk=None):
@@ -120,17 +109,15 @@ class CommentViewSet(ModelViewSet):
         serializer = CommentReportSerializer(data=request.data)
         
         if serializer.is_valid():
-            # 既に報告済みかチェック
-            if CommentReport.objects.filter(
-                comment=comment, 
-                reporter=request.user
-            ).exists():
+            try:
+                # 報告済みかどうかは一意制約で判定する
+                with transaction.atomic():
+                    serializer.save(comment=comment, reporter=request.user)
+            except IntegrityError:
                 return Response(
                     {'error': '既に報告済みです。'}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            
-            serializer.save(comment=comment, reporter=request.user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -167,11 +154,12 @@ class CommentViewSet(ModelViewSet):
 class ArticleCommentListView(generics.ListAPIView):
     """記事のコメント一覧"""
     
-    serializer_class = CommentSerializer
+    serializer_class = CommentFlatSerializer
     permission_classes = [permissions.AllowAny]
     filter_backends = [OrderingFilter]
     ordering_fields = ['created_at', 'like_count']
-    ordering = ['created_at']
+    ordering = ['created_at', 'id']
+    pagination_class = CommentCursorPagination
     
     def get_queryset(self):
         """記事IDに基づいてコメントを取得"""
@@ -182,30 +170,63 @@ class ArticleCommentListView(generics.ListAPIView):
         if article.status != 'published':
             return Comment.objects.none()
         
-        # 親コメントのみを取得（返信は各コメントのrepliesフィールドで取得）
-        return Comment.objects.filter(
-            article=article,
-            parent__isnull=True,
-            is_approved=True
-        ).select_related('author').prefetch_related(
-            Prefetch(
-                'replies',
-                queryset=Comment.objects.filter(is_approved=True).select_related('author').order_by('created_at'),
-                to_attr='prefetched_replies'
-            )
+        # 親コメントのみを取得（返信は list() でまとめて取得してツリーに組み立てる）
+        return self.get_serializer_class().setup_eager_loading(
+            Comment.objects.filter(
+                article=article,
+                parent__isnull=True,
+                is_approved=True
+            ),
+            self.request.user
         )
+    
+    def list(self, request, *args, **kwargs):
+        """親コメントと返信を1つのシリアライザーで平坦に出力し、親IDでツリーに組み立てる"""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        roots = list(page if page is not None else queryset)
+        
+        rows = self.get_serializer(roots + self.get_replies(roots), many=True).data
+        rows_by_id = {row['id']: row for row in rows}
+        for row in rows[len(roots):]:
+            rows_by_id[row['parent']]['replies'].append(row)
+        data = rows[:len(roots)]
+        
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+    
+    def get_replies(self, roots):
+        """親コメントへの承認済み返信を階層ごとに取得（1階層につき1クエリ）"""
+        replies = []
+        parent_ids = [comment.pk for comment in roots]
+        for _ in range(Comment.MAX_DEPTH):
+            if not parent_ids:
+                break
+            level = list(self.get_serializer_class().setup_eager_loading(
+                Comment.objects.filter(parent_id__in=parent_ids, is_approved=True).order_by('created_at'),
+                self.request.user
+            ))
+            replies.extend(level)
+            parent_ids = [comment.pk for comment in level]
+        return replies
 
 
 class CommentModerationViewSet(ModelViewSet):
     """コメント管理API（管理者用）"""
     
-    queryset = Comment.objects.all().select_related('author', 'article')
+    queryset = Comment.objects.all()
     serializer_class = CommentModerationSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_fields = ['is_approved', 'is_spam', 'article']
     ordering_fields = ['created_at', 'updated_at']
-    ordering = ['-created_at']
+    ordering = ['-created_at', '-id']
+    pagination_class = CommentCursorPagination
+    
+    def get_queryset(self):
+        """シリアライザーが出力する関連データ・報告数をまとめて読み込む"""
+        return CommentModerationSerializer.setup_eager_loading(super().get_queryset(), self.request.user)
     
     def get_permissions(self):
         """編集者以上のみアクセス可能"""